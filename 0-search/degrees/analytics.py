@@ -0,0 +1,219 @@
+import argparse
+import gzip
+import json
+import multiprocessing
+import os
+import random
+import time
+from array import array
+from collections import Counter
+
+import degrees
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compute aggregate statistics over the co-star graph."
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--samples", type=int, default=64,
+                        help="BFS sources sampled from the largest component")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="processes sharing the loaded graph")
+    parser.add_argument("--top", type=int, default=20,
+                        help="people listed in the center ranking")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--snapshot", action="store_true",
+                        help="reuse or write a binary snapshot of the "
+                             "loaded data (trusted directories only)")
+    parser.add_argument("--output", default="analytics.json.gz")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    print("Loading data...")
+    degrees.load_data(args.directory, streaming=True,
+                      use_snapshot=args.snapshot)
+    print("Data loaded.")
+
+    stats = analyze(args.samples, args.workers, args.top, args.seed)
+    stats["seconds"] = round(time.perf_counter() - start, 1)
+
+    with gzip.open(args.output, "wt", encoding="utf-8") as f:
+        json.dump(stats, f, separators=(",", ":"))
+    print(f"Wrote {args.output} in {stats['seconds']} seconds.")
+
+
+def analyze(samples, workers, top, seed):
+    """
+    Returns degree distribution, connected components, eccentricity
+    estimates and a ranking by estimated average distance, computed
+    from `samples` BFS runs over the loaded `degrees.index`.
+    """
+    index = degrees.index
+    size = len(index.person_ids)
+
+    # Forked workers inherit the loaded graph without copying it
+    context = multiprocessing.get_context("fork")
+    with context.Pool(workers) as pool:
+        print("Counting co-stars...")
+        histogram = Counter()
+        for counts in pool.imap_unordered(costar_degrees,
+                                          chunks(range(size), workers * 4)):
+            histogram.update(counts)
+
+        print("Finding connected components...")
+        components = component_labels()
+        component_sizes = Counter(components)
+        largest, largest_size = component_sizes.most_common(1)[0]
+
+        print(f"Running {samples} sampled BFS...")
+        members = [person for person in range(size)
+                   if components[person] == largest]
+        sources = random.Random(seed).sample(
+            members, min(samples, len(members))
+        )
+        totals = array("I", bytes(4 * size))
+        farthest = array("B", bytes(size))
+        eccentricities = {}
+        for sums, maxima, source_eccentricities in pool.imap_unordered(
+            sampled_distances, chunks(sources, workers)
+        ):
+            for person in range(size):
+                totals[person] += sums[person]
+                if maxima[person] > farthest[person]:
+                    farthest[person] = maxima[person]
+            eccentricities.update(source_eccentricities)
+
+    # Average distance to the sampled sources estimates closeness
+    ranking = sorted(members, key=lambda person: totals[person])[:top]
+    return {
+        "people": size,
+        "movies": len(index.movie_ids),
+        "costar_degree_histogram": sorted(histogram.items()),
+        "components": len(component_sizes),
+        "largest_component": largest_size,
+        "component_size_histogram": sorted(
+            Counter(component_sizes.values()).items()
+        ),
+        "samples": len(sources),
+        "sampled_eccentricities": {
+            index.person_ids[person]: eccentricity
+            for person, eccentricity in eccentricities.items()
+        },
+        "diameter_lower_bound": max(eccentricities.values(), default=0),
+        "eccentricity_lower_bound_histogram": sorted(
+            Counter(farthest[person] for person in members).items()
+        ),
+        "center": [
+            {
+                "person_id": index.person_ids[person],
+                "name": degrees.people[index.person_ids[person]]["name"],
+                "average_distance": round(totals[person] / len(sources), 3),
+            }
+            for person in ranking
+        ],
+    }
+
+
+def chunks(items, count):
+    """
+    Splits `items` into at most `count` contiguous lists.
+    """
+    items = list(items)
+    step = max(1, -(-len(items) // count))
+    return [items[i:i + step] for i in range(0, len(items), step)]
+
+
+def costar_degrees(people):
+    """
+    Returns a histogram of the number of distinct co-stars
+    of each interned person in `people`.
+    """
+    index = degrees.index
+    histogram = Counter()
+    for person in people:
+        costars = set()
+        for movie in index.movies_for_person(person):
+            costars.update(index.stars_for_movie(movie))
+        costars.discard(person)
+        histogram[len(costars)] += 1
+    return histogram
+
+
+def component_labels():
+    """
+    Returns the connected component root of every interned person,
+    joining the stars of each movie with union-find.
+    """
+    index = degrees.index
+    parent = array("i", range(len(index.person_ids)))
+
+    def find(person):
+        root = person
+        while parent[root] != root:
+            root = parent[root]
+        while parent[person] != root:
+            parent[person], person = root, parent[person]
+        return root
+
+    for movie in range(len(index.movie_ids)):
+        stars = index.stars_for_movie(movie)
+        if len(stars) < 2:
+            continue
+        root = find(stars[0])
+        for star in stars[1:]:
+            other = find(star)
+            if other != root:
+                parent[other] = root
+    return array("i", (find(person) for person in range(len(parent))))
+
+
+def sampled_distances(sources):
+    """
+    Runs a BFS from each interned source over the CSR arrays.
+
+    Returns per-person sums and maxima of the distances to the
+    sources, and the eccentricity of each source.
+    """
+    index = degrees.index
+    size = len(index.person_ids)
+    person_offsets = index.person_offsets
+    person_movies = index.person_movies
+    movie_offsets = index.movie_offsets
+    movie_stars = index.movie_stars
+
+    sums = array("I", bytes(4 * size))
+    maxima = array("B", bytes(size))
+    eccentricities = {}
+    for source in sources:
+        distances = array("b", [-1]) * size
+        distances[source] = 0
+        explored_movies = set()
+        layer = [source]
+        depth = 0
+        while layer:
+            depth += 1
+            next_layer = []
+            for person in layer:
+                for i in range(person_offsets[person],
+                               person_offsets[person + 1]):
+                    movie = person_movies[i]
+                    if movie in explored_movies:
+                        continue
+                    explored_movies.add(movie)
+                    for j in range(movie_offsets[movie],
+                                   movie_offsets[movie + 1]):
+                        star = movie_stars[j]
+                        if distances[star] < 0:
+                            distances[star] = depth
+                            sums[star] += depth
+                            if depth > maxima[star]:
+                                maxima[star] = depth
+                            next_layer.append(star)
+            layer = next_layer
+        eccentricities[source] = depth - 1
+    return sums, maxima, eccentricities
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,18 @@
+import argparse
 import csv
+import functools
+import json
+import multiprocessing
 import sys
+from array import array
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
 
-from util import Node, StackFrontier, QueueFrontier
+import snapshot
+import tables
+from index import CoStarIndex
+from nameindex import NameIndex
+from util import LRUCache, Node, StackFrontier, QueueFrontier
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,11 +23,81 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Compact CSR co-star index, built by load_data when requested
+index = None
 
-def load_data(directory):
+# LRU of BFS trees per source, enabled by use_tree_cache
+tree_cache = None
+
+# Prefix/trigram index over names, built by load_data when requested
+name_index = None
+
+# Lowest similarity accepted when resolving a misspelled name
+FUZZY_THRESHOLD = 0.5
+
+# Fuzzy matches this close to the best one are treated as ambiguous
+FUZZY_TIE = 0.05
+
+# How non-interactive callers pick among people sharing a name:
+# "most-movies", "birth:YEAR" or "none"
+DEFAULT_POLICY = "most-movies"
+
+
+def load_data(directory, compact=False, use_snapshot=False, streaming=False,
+              fuzzy=False):
     """
     Load data from CSV files into memory.
+
+    See `read_data` for `compact`, `use_snapshot` and `streaming`.
+    If `fuzzy` is True, a `NameIndex` is built for misspelled or
+    partial names.
+    """
+    global name_index
+
+    read_data(directory, compact, use_snapshot, streaming)
+    name_index = NameIndex(names) if fuzzy else None
+
+
+def read_data(directory, compact=False, use_snapshot=False, streaming=False):
+    """
+    Read data from CSV files into `names`, `people` and `movies`.
+
+    If `compact` is True, the co-star sets are moved into a
+    `CoStarIndex` and dropped from `people` and `movies`.
+
+    If `streaming` is True, the CSV files are parsed in chunks straight
+    into a `CoStarIndex` and read-only columnar `people`/`movies` tables,
+    without building a record per row.
+
+    If `use_snapshot` is True and `compact` or `streaming` is, a binary
+    snapshot stored next to the CSV files is reused while they are
+    unchanged, and written otherwise. Snapshots are unpickled, so only
+    enable them on directories you trust. The dict mode has no snapshot:
+    unpickling its nested dicts is barely faster than parsing the CSV.
     """
+    global index, names, people, movies
+    mode = "streaming" if streaming else "compact" if compact else "dict"
+    use_snapshot = use_snapshot and mode != "dict"
+
+    if use_snapshot:
+        loaded = snapshot.load(directory, mode)
+        if loaded is not None:
+            data, index = loaded
+            if streaming:
+                names, people, movies = tables.restore(data, index)
+            else:
+                names.update(data[0])
+                people.update(data[1])
+                movies.update(data[2])
+            return
+
+    if streaming:
+        names, people, movies, index = tables.load_streaming(directory)
+        if use_snapshot:
+            snapshot.save(directory, mode,
+                          tables.columns(names, people, movies), index)
+        return
+
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
@@ -51,16 +132,83 @@ def load_data(directory):
             except KeyError:
                 pass
 
+    if compact:
+        index = CoStarIndex.from_data(people, movies)
+        for person in people.values():
+            del person["movies"]
+        for movie in movies.values():
+            del movie["stars"]
+
+    if use_snapshot:
+        snapshot.save(directory, mode, (names, people, movies), index)
+
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    parser = argparse.ArgumentParser(
+        description="Find degrees of separation between two actors."
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--compact", action="store_true",
+                        help="store the co-star graph as a CSR index")
+    parser.add_argument("--streaming", action="store_true",
+                        help="load the CSV files in chunks into columnar "
+                             "tables to bound memory")
+    parser.add_argument("--snapshot", action="store_true",
+                        help="reuse or write a binary snapshot of the "
+                             "--compact or --streaming data next to the "
+                             "CSV files (trusted directories only)")
+    parser.add_argument("--bidirectional", action="store_true",
+                        help="search from both ends at once")
+    parser.add_argument("--fuzzy", action="store_true",
+                        help="resolve misspelled or partial names")
+    parser.add_argument("--policy", default=DEFAULT_POLICY,
+                        help="how batch and server queries pick among "
+                             "people sharing a name: most-movies, "
+                             "birth:YEAR or none")
+    parser.add_argument("--cache-mb", type=float,
+                        help="cache BFS trees per source up to this budget")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="answer 'source,target' lines from FILE "
+                             "('-' for stdin) as JSON lines")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes used to answer a batch")
+    parser.add_argument("--serve", metavar="PORT", type=int,
+                        help="answer GET /?source=...&target=... over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    args = parser.parse_args()
+    try:
+        check_policy(args.policy)
+    except ValueError as e:
+        parser.error(str(e))
+
+    # Keep stdout clean for JSON lines in batch mode
+    log = sys.stderr if args.batch else sys.stdout
 
     # Load data from files into memory
-    print("Loading data...")
-    load_data(directory)
-    print("Data loaded.")
+    print("Loading data...", file=log)
+    load_data(args.directory, compact=args.compact, streaming=args.streaming,
+              use_snapshot=args.snapshot, fuzzy=args.fuzzy)
+    print("Data loaded.", file=log)
+    peak = tables.peak_memory()
+    if peak is not None:
+        print(f"Peak memory: {peak / 2 ** 20:.1f} MB", file=log)
+    if args.cache_mb is not None:
+        use_tree_cache(int(args.cache_mb * 2 ** 20))
+
+    if args.batch:
+        if args.batch == "-":
+            run_batch(sys.stdin, sys.stdout, args.workers,
+                      args.bidirectional, args.policy)
+        else:
+            with open(args.batch, encoding="utf-8") as f:
+                run_batch(f, sys.stdout, args.workers,
+                          args.bidirectional, args.policy)
+        if tree_cache is not None and args.workers <= 1:
+            print(f"Tree cache: {tree_cache.stats()}", file=log)
+        return
+    if args.serve is not None:
+        serve(args.host, args.serve, args.bidirectional, args.policy)
+        return
 
     source = person_id_for_name(input("Name: "))
     if source is None:
@@ -69,7 +217,7 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    path = shortest_path(source, target, bidirectional=args.bidirectional)
 
     if path is None:
         print("Not connected.")
@@ -84,13 +232,179 @@ def main():
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def answer_query(pair, bidirectional=False, policy=DEFAULT_POLICY, k=None):
+    """
+    Resolves a (source name, target name) pair and returns the
+    shortest path between them as a JSON-serializable dictionary.
+
+    If `k` is given, up to `k` alternative shortest paths are
+    included as well, all found by a single `all_shortest_paths` pass.
+    """
+    source_name, target_name = pair
+    answer = {"source": source_name, "target": target_name}
+
+    source = person_id_for_name(source_name, interactive=False, policy=policy)
+    target = person_id_for_name(target_name, interactive=False, policy=policy)
+    if source is None or target is None:
+        missing = source_name if source is None else target_name
+        answer["error"] = f"Person not found: {missing}"
+        return answer
+
+    # With k, one layered BFS yields the path and its alternatives
+    if k is None:
+        path = shortest_path(source, target, bidirectional=bidirectional)
+    else:
+        paths = all_shortest_paths(source, target, k=max(k, 1))
+        path = paths[0] if paths else None
+
+    if path is None:
+        answer["degrees"] = None
+        answer["path"] = None
+    else:
+        answer["degrees"] = len(path)
+        answer["path"] = describe_path(path)
+        if k is not None:
+            answer["paths"] = [describe_path(path) for path in paths[:k]]
+    return answer
+
+
+def describe_path(path):
+    """
+    Returns a JSON-serializable list of the steps of a path.
+    """
+    return [
+        {
+            "movie_id": movie_id,
+            "movie": movies[movie_id]["title"],
+            "person_id": person_id,
+            "person": people[person_id]["name"],
+        }
+        for movie_id, person_id in path
+    ]
+
+
+def run_batch(lines, out, workers=1, bidirectional=False,
+              policy=DEFAULT_POLICY):
+    """
+    Answers one 'source,target' query per line of `lines`,
+    writing each answer to `out` as a JSON line in input order.
+    Malformed lines get an error answer naming their line number.
+
+    With more than one worker, queries are fanned out over a pool of
+    forked processes that share the loaded graph copy-on-write.
+    """
+    reader = csv.reader(lines)
+    rows = ((reader.line_num, row) for row in reader)
+    query = functools.partial(answer_row, bidirectional=bidirectional,
+                              policy=policy)
+
+    if workers <= 1:
+        for row in rows:
+            out.write(json.dumps(query(row)) + "\n")
+        return
+
+    # Forked workers inherit the module-level graph without copying it
+    with multiprocessing.get_context("fork").Pool(workers) as pool:
+        for answer in pool.imap(query, rows, chunksize=64):
+            out.write(json.dumps(answer) + "\n")
+
+
+def answer_row(numbered_row, bidirectional=False, policy=DEFAULT_POLICY):
+    """
+    Answers a (line number, csv row) pair from a batch file, or
+    reports the line as malformed if it is not 'source,target'.
+    """
+    line, row = numbered_row
+    if len(row) != 2:
+        return {"line": line, "error": "expected 'source,target'"}
+    return answer_query((row[0].strip(), row[1].strip()),
+                        bidirectional=bidirectional, policy=policy)
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """
+    Answers GET /?source=NAME&target=NAME[&policy=POLICY][&k=K] with a
+    JSON path and up to K alternative shortest paths,
+    and GET /stats with the tree cache counters.
+    """
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/stats":
+            stats = None if tree_cache is None else tree_cache.stats()
+            self.respond(200, {"tree_cache": stats})
+            return
+        params = parse_qs(url.query)
+        if "source" not in params or "target" not in params:
+            self.respond(400, {"error": "source and target are required"})
+            return
+        policy = params.get("policy", [self.server.policy])[0]
+        try:
+            check_policy(policy)
+        except ValueError as e:
+            self.respond(400, {"error": str(e)})
+            return
+        k = int(params["k"][0]) if params.get("k", [""])[0].isdigit() else None
+        answer = answer_query(
+            (params["source"][0], params["target"][0]),
+            bidirectional=self.server.bidirectional,
+            policy=policy,
+            k=k
+        )
+        self.respond(404 if "error" in answer else 200, answer)
+
+    def respond(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def serve(host, port, bidirectional=False, policy=DEFAULT_POLICY):
+    """
+    Serves shortest-path queries over HTTP, keeping the graph loaded
+    across requests.
+    """
+    server = ThreadingHTTPServer((host, port), QueryHandler)
+    server.bidirectional = bidirectional
+    server.policy = policy
+    print(f"Serving on http://{host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def shortest_path(source, target, bidirectional=False):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
+    If `bidirectional` is True, the search grows a frontier from both
+    ends and stops as soon as they meet. If a tree cache is enabled,
+    the path is read from the cached BFS tree of the source instead.
+
     If no possible path, returns None.
     """
+    if index is not None:
+        source = index.person_index[source]
+        target = index.person_index[target]
+        if tree_cache is not None:
+            path = cached_shortest_path(source, target)
+        elif bidirectional:
+            path = bidirectional_shortest_path(source, target, index.neighbors)
+        else:
+            path = compact_shortest_path(source, target)
+        return None if path is None else index.decode_path(path)
+
+    if tree_cache is not None:
+        return cached_shortest_path(source, target)
+    if bidirectional:
+        return bidirectional_shortest_path(source, target)
 
     frontier = QueueFrontier()
     frontier.add(Node(source, None, None))
@@ -114,15 +428,315 @@ def shortest_path(source, target):
     return None
 
 
-def person_id_for_name(name):
+def compact_shortest_path(source, target):
+    """
+    Returns the shortest list of interned (movie, person) pairs
+    that connect the source to the target, walking the CSR arrays
+    of the loaded `index` directly.
+
+    If no possible path, returns None.
+    """
+    parent_movie, parent_person = compact_bfs_tree(source, target)
+    return compact_path_from_tree(parent_movie, parent_person, source, target)
+
+
+def compact_bfs_tree(source, target=None):
+    """
+    Runs BFS from the interned source over the CSR arrays of `index`.
+
+    Returns two arrays indexed by interned person, holding the movie
+    and person that reached each person, or -1 for people not reached
+    (and for the source). The search stops early once `target` is
+    reached; with no target the whole component is explored.
+    """
+    person_offsets = index.person_offsets
+    person_movies = index.person_movies
+    movie_offsets = index.movie_offsets
+    movie_stars = index.movie_stars
+
+    size = len(index.person_ids)
+    parent_movie = array("i", [-1]) * size
+    parent_person = array("i", [-1]) * size
+    reached = bytearray(size)
+    reached[source] = 1
+
+    # A movie only needs expanding once: all of its stars are reached then
+    explored_movies = bytearray(len(index.movie_ids))
+
+    layer = [source]
+    while layer and (target is None or not reached[target]):
+        next_layer = []
+        for person in layer:
+            for i in range(person_offsets[person], person_offsets[person + 1]):
+                movie = person_movies[i]
+                if explored_movies[movie]:
+                    continue
+                explored_movies[movie] = 1
+                for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                    star = movie_stars[j]
+                    if not reached[star]:
+                        reached[star] = 1
+                        parent_movie[star] = movie
+                        parent_person[star] = person
+                        next_layer.append(star)
+        layer = next_layer
+
+    return parent_movie, parent_person
+
+
+def compact_path_from_tree(parent_movie, parent_person, source, target):
+    """
+    Walks the parent arrays of `compact_bfs_tree` back from the target.
+
+    If the target was not reached, returns None.
+    """
+    if target != source and parent_person[target] < 0:
+        return None
+
+    path = []
+    person = target
+    while person != source:
+        path.append((parent_movie[person], person))
+        person = parent_person[person]
+    path.reverse()
+    return path
+
+
+def bfs_tree(source):
+    """
+    Runs BFS from the source over the whole component.
+
+    Returns two dictionaries mapping each reached person to the movie
+    and person that reached them.
+    """
+    parent_movie = {source: None}
+    parent_person = {source: None}
+    layer = [source]
+    while layer:
+        next_layer = []
+        for person_id in layer:
+            for movie_id, neighbor_id in neighbors_for_person(person_id):
+                if neighbor_id not in parent_person:
+                    parent_movie[neighbor_id] = movie_id
+                    parent_person[neighbor_id] = person_id
+                    next_layer.append(neighbor_id)
+        layer = next_layer
+    return parent_movie, parent_person
+
+
+def path_from_tree(parent_movie, parent_person, source, target):
+    """
+    Walks the parent pointers of a BFS tree rooted at the source
+    back from the target.
+
+    If the target was not reached, returns None.
+    """
+    if target not in parent_person:
+        return None
+
+    path = []
+    person = target
+    while person != source:
+        path.append((parent_movie[person], person))
+        person = parent_person[person]
+    path.reverse()
+    return path
+
+
+def tree_size(tree):
+    """
+    Returns the memory in bytes held by a cached BFS tree.
+
+    Compact trees are arrays and measured exactly. Dict trees only
+    refer to ids already held by `people` and `movies`, so only the
+    dicts themselves are counted.
+    """
+    parent_movie, parent_person = tree
+    return sys.getsizeof(parent_movie) + sys.getsizeof(parent_person)
+
+
+def use_tree_cache(max_bytes):
+    """
+    Caches full BFS trees per source in an LRU bounded by `max_bytes`,
+    so later targets from a cached source are answered by walking
+    parent pointers. Passing None disables the cache.
+    """
+    global tree_cache
+    tree_cache = None if max_bytes is None else LRUCache(max_bytes, tree_size)
+
+
+def cached_shortest_path(source, target):
+    """
+    Returns the shortest path from the source to the target using
+    the BFS tree of the source in `tree_cache`, computing it on a miss.
+    """
+    tree = tree_cache.get(source)
+    if index is not None:
+        if tree is None:
+            tree = compact_bfs_tree(source)
+            tree_cache.put(source, tree)
+        return compact_path_from_tree(*tree, source, target)
+    if tree is None:
+        tree = bfs_tree(source)
+        tree_cache.put(source, tree)
+    return path_from_tree(*tree, source, target)
+
+
+def bidirectional_shortest_path(source, target, neighbors=None):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, expanding one BFS layer
+    at a time from whichever side has the smaller frontier.
+
+    `neighbors` maps a person to their (movie, person) pairs and
+    defaults to `neighbors_for_person`.
+
+    If no possible path, returns None.
+    """
+    if source == target:
+        return []
+    if neighbors is None:
+        neighbors = neighbors_for_person
+
+    # Maps each reached person to the (movie_id, person_id) step
+    # that reached them, or None for the roots
+    forward_parents = {source: None}
+    backward_parents = {target: None}
+    forward_frontier = [source]
+    backward_frontier = [target]
+
+    while forward_frontier and backward_frontier:
+
+        # Always expand the cheaper side
+        if len(forward_frontier) <= len(backward_frontier):
+            forward_frontier, meeting = expand_layer(
+                forward_frontier, forward_parents, backward_parents, neighbors
+            )
+        else:
+            backward_frontier, meeting = expand_layer(
+                backward_frontier, backward_parents, forward_parents, neighbors
+            )
+
+        if meeting is not None:
+
+            # Walk back from the meeting point to the source
+            path = []
+            person_id = meeting
+            while forward_parents[person_id] is not None:
+                movie_id, parent_id = forward_parents[person_id]
+                path.insert(0, (movie_id, person_id))
+                person_id = parent_id
+
+            # Walk forward from the meeting point to the target
+            person_id = meeting
+            while backward_parents[person_id] is not None:
+                movie_id, parent_id = backward_parents[person_id]
+                path.append((movie_id, parent_id))
+                person_id = parent_id
+            return path
+
+    return None
+
+
+def expand_layer(frontier, parents, other_parents, neighbors):
+    """
+    Expands a whole BFS layer, recording parents for new people.
+
+    Returns the next layer and the first person already reached
+    by the opposite search, or None if the searches have not met.
+    """
+    next_frontier = []
+    for person_id in frontier:
+        for movie_id, neighbor_id in neighbors(person_id):
+            if neighbor_id in parents:
+                continue
+            parents[neighbor_id] = (movie_id, person_id)
+            if neighbor_id in other_parents:
+                return next_frontier, neighbor_id
+            next_frontier.append(neighbor_id)
+    return next_frontier, None
+
+
+def all_shortest_paths(source, target, k=None, max_depth=None):
+    """
+    Returns shortest lists of (movie_id, person_id) pairs that connect
+    the source to the target: all of them, or only the first `k`.
+
+    A single layered BFS records every parent one layer closer to the
+    source, so ties are kept instead of discarded. If the target is
+    not connected within `max_depth` degrees, returns an empty list.
+    """
+    neighbors = neighbors_for_person
+    if index is not None:
+        source = index.person_index[source]
+        target = index.person_index[target]
+        neighbors = index.neighbors
+
+    # Maps each reached person to their depth and to every
+    # (movie, person) step from the previous layer that reaches them
+    depths = {source: 0}
+    parents = {source: []}
+
+    layer = [source]
+    depth = 0
+    while layer and target not in depths:
+        if max_depth is not None and depth >= max_depth:
+            return []
+        depth += 1
+        next_layer = []
+        for person in layer:
+            for movie, neighbor in neighbors(person):
+                if neighbor not in depths:
+                    depths[neighbor] = depth
+                    parents[neighbor] = [(movie, person)]
+                    next_layer.append(neighbor)
+                elif depths[neighbor] == depth:
+                    parents[neighbor].append((movie, person))
+        layer = next_layer
+
+    if target not in depths:
+        return []
+
+    # Walk the parent lists back from the target, depth first
+    paths = []
+    stack = [(target, [])]
+    while stack and (k is None or len(paths) < k):
+        person, suffix = stack.pop()
+        if person == source:
+            paths.append(suffix)
+            continue
+        for movie, parent in reversed(parents[person]):
+            stack.append((parent, [(movie, person)] + suffix))
+
+    if index is not None:
+        paths = [index.decode_path(path) for path in paths]
+    return paths
+
+
+def person_id_for_name(name, interactive=True, policy=DEFAULT_POLICY):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
+
+    If a name index is loaded, unknown names resolve to the most
+    similar known name; the people of names scoring within FUZZY_TIE
+    of it are ambiguous. If `interactive` is False, ambiguous names are
+    resolved by `policy` instead of prompting for an id.
     """
     person_ids = list(names.get(name.lower(), set()))
+    if len(person_ids) == 0 and name_index is not None:
+        matches = name_index.lookup(name)
+        if matches and matches[0][0] >= FUZZY_THRESHOLD:
+            best = matches[0][0]
+            person_ids = [person_id
+                          for score, key in matches
+                          if score >= max(FUZZY_THRESHOLD, best - FUZZY_TIE)
+                          for person_id in names[key]]
     if len(person_ids) == 0:
         return None
     elif len(person_ids) > 1:
+        if not interactive:
+            return resolve_ambiguity(person_ids, policy)
         print(f"Which '{name}'?")
         for person_id in person_ids:
             person = people[person_id]
@@ -140,11 +754,59 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def check_policy(policy):
+    """
+    Returns `policy` if `resolve_ambiguity` understands it,
+    raises ValueError otherwise.
+    """
+    if policy in ("most-movies", "none"):
+        return policy
+    if policy.startswith("birth:") and policy[len("birth:"):].isdigit():
+        return policy
+    raise ValueError(f"unknown policy {policy!r}: "
+                     "expected most-movies, birth:YEAR or none")
+
+
+def resolve_ambiguity(person_ids, policy):
+    """
+    Picks one of several people sharing a name without prompting.
+
+    "most-movies" picks the person with the most movies,
+    "birth:YEAR" the one born that year (then the most movies),
+    and "none" gives up. Returns None if no one matches.
+    Raises ValueError for any other policy.
+    """
+    check_policy(policy)
+    if policy.startswith("birth:"):
+        year = policy[len("birth:"):]
+        person_ids = [person_id for person_id in person_ids
+                      if people[person_id]["birth"] == year]
+    elif policy != "most-movies":
+        return None
+    if not person_ids:
+        return None
+    return max(person_ids, key=lambda person_id: (movie_count(person_id),
+                                                  person_id))
+
+
+def movie_count(person_id):
+    """
+    Returns the number of movies a person starred in.
+    """
+    if index is not None:
+        person = index.person_index[person_id]
+        return index.person_offsets[person + 1] - index.person_offsets[person]
+    return len(people[person_id]["movies"])
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
+    if index is not None:
+        return set(index.decode_path(index.neighbors(index.person_index[person_id])))
+
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
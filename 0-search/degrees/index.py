@@ -0,0 +1,93 @@
+from array import array
+
+
+class CoStarIndex():
+    """
+    Compact co-star graph stored as two CSR (compressed sparse row)
+    adjacency lists over integer-interned ids.
+
+    The movies of person `p` are
+    `person_movies[person_offsets[p]:person_offsets[p + 1]]`, and the
+    stars of movie `m` are
+    `movie_stars[movie_offsets[m]:movie_offsets[m + 1]]`.
+    """
+
+    def __init__(self, person_ids, movie_ids, person_offsets, person_movies,
+                 movie_offsets, movie_stars, person_index=None,
+                 movie_index=None):
+        self.person_ids = person_ids
+        self.movie_ids = movie_ids
+        if person_index is None:
+            person_index = {
+                person_id: i for i, person_id in enumerate(person_ids)
+            }
+        if movie_index is None:
+            movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+        self.person_index = person_index
+        self.movie_index = movie_index
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_stars = movie_stars
+
+    @classmethod
+    def from_data(cls, people, movies):
+        """
+        Builds the index from the `people` and `movies` dictionaries
+        filled by `degrees.load_data`.
+        """
+        person_ids = list(people)
+        movie_ids = list(movies)
+        person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+        movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+
+        person_offsets = array("i", [0])
+        person_movies = array("i")
+        for person_id in person_ids:
+            person_movies.extend(
+                movie_index[movie_id] for movie_id in people[person_id]["movies"]
+            )
+            person_offsets.append(len(person_movies))
+
+        movie_offsets = array("i", [0])
+        movie_stars = array("i")
+        for movie_id in movie_ids:
+            movie_stars.extend(
+                person_index[person_id] for person_id in movies[movie_id]["stars"]
+            )
+            movie_offsets.append(len(movie_stars))
+
+        return cls(person_ids, movie_ids, person_offsets, person_movies,
+                   movie_offsets, movie_stars)
+
+    def movies_for_person(self, person):
+        """
+        Returns the interned movie ids a person starred in.
+        """
+        return self.person_movies[
+            self.person_offsets[person]:self.person_offsets[person + 1]
+        ]
+
+    def stars_for_movie(self, movie):
+        """
+        Returns the interned person ids that starred in a movie.
+        """
+        return self.movie_stars[
+            self.movie_offsets[movie]:self.movie_offsets[movie + 1]
+        ]
+
+    def neighbors(self, person):
+        """
+        Yields interned (movie, person) pairs for people
+        who starred with a given person.
+        """
+        for movie in self.movies_for_person(person):
+            for neighbor in self.stars_for_movie(movie):
+                yield movie, neighbor
+
+    def decode_path(self, path):
+        """
+        Maps a path of interned (movie, person) pairs back to IMDB ids.
+        """
+        return [(self.movie_ids[movie], self.person_ids[person])
+                for movie, person in path]
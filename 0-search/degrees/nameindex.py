@@ -0,0 +1,97 @@
+import bisect
+import heapq
+from array import array
+from collections import Counter
+
+# Names ranked exactly after the trigram vote
+MAX_CANDIDATES = 32
+
+# Posting entries read per lookup, rarest trigrams first
+POSTING_BUDGET = 2000
+
+# Names starting with the query considered per lookup, shortest kept
+PREFIX_SCAN = 1000
+
+
+def trigrams(key):
+    """
+    Returns the set of trigrams of a lowercase name, padded so that
+    word starts and ends count as well.
+    """
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex():
+    """
+    Prefix and trigram index over the lowercase names of `names`,
+    for ranked fuzzy lookup of misspelled or partial names.
+    """
+
+    def __init__(self, names):
+        self.keys = sorted(names)
+        postings = {}
+        for i, key in enumerate(self.keys):
+            for trigram in trigrams(key):
+                postings.setdefault(trigram, array("i")).append(i)
+        self.postings = postings
+
+    def prefix(self, query, limit):
+        """
+        Returns up to `limit` of the shortest names starting with
+        `query`, among the first PREFIX_SCAN such names.
+        """
+        start = bisect.bisect_left(self.keys, query)
+        matches = []
+        for key in self.keys[start:start + PREFIX_SCAN]:
+            if not key.startswith(query):
+                break
+            matches.append(key)
+        return heapq.nsmallest(limit, matches, key=lambda key: (len(key), key))
+
+    def candidates(self, query_trigrams):
+        """
+        Returns indices of the names sharing the most trigrams with the
+        query, counting votes over the rarest postings first.
+        """
+        known = sorted(
+            (self.postings[trigram] for trigram in query_trigrams
+             if trigram in self.postings),
+            key=len
+        )
+        votes = Counter()
+        read = 0
+        for posting in known:
+            if read and read + len(posting) > POSTING_BUDGET:
+                break
+            votes.update(posting)
+            read += len(posting)
+        return [i for i, _ in votes.most_common(MAX_CANDIDATES)]
+
+    def lookup(self, name, limit=5):
+        """
+        Returns up to `limit` (score, name) pairs ranked by similarity
+        to `name`, best first. Scores range from 0 to 1.
+        """
+        query = name.lower().strip()
+        if not query:
+            return []
+        query_trigrams = trigrams(query)
+
+        # A prefix scores the share of the name it covers, so that
+        # short prefixes of long names stay below any useful threshold
+        scores = {}
+        for key in self.prefix(query, limit):
+            scores[key] = len(query) / len(key)
+        for i in self.candidates(query_trigrams):
+            key = self.keys[i]
+            key_trigrams = trigrams(key)
+            shared = len(query_trigrams & key_trigrams)
+            dice = 2 * shared / (len(query_trigrams) + len(key_trigrams))
+            scores[key] = max(scores.get(key, 0), dice)
+
+        ranked = sorted(
+            ((score, key) for key, score in scores.items()),
+            key=lambda item: (-item[0], item[1])
+        )
+        return ranked[:limit]
@@ -0,0 +1,113 @@
+import mmap
+import os
+import pickle
+import struct
+from array import array
+
+from index import CoStarIndex
+
+VERSION = 3
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+
+# Loaded structures, pickled
+DATA_FILE = ".degrees.snapshot"
+
+# Raw CSR arrays of the compact index, memory-mapped on load
+INDEX_FILE = ".degrees.index"
+INDEX_HEADER = struct.Struct("<4q")
+
+
+def source_stamps(directory):
+    """
+    Returns the (mtime, size) of each CSV file in `directory`.
+    """
+    stamps = {}
+    for name in SOURCES:
+        stat = os.stat(os.path.join(directory, name))
+        stamps[name] = (stat.st_mtime_ns, stat.st_size)
+    return stamps
+
+
+def load(directory, mode):
+    """
+    Returns the (data, index) snapshot written by `save` for `mode`,
+    or None if there is none or the CSV files changed since it was written.
+    """
+    try:
+        with open(os.path.join(directory, DATA_FILE), "rb") as f:
+            header = pickle.load(f)
+            if (header["version"] != VERSION
+                    or header["mode"] != mode
+                    or header["sources"] != source_stamps(directory)):
+                return None
+            data = pickle.load(f)
+            if not header["indexed"]:
+                return data, None
+            person_ids, movie_ids = pickle.load(f)
+        index = load_index(
+            os.path.join(directory, INDEX_FILE), person_ids, movie_ids
+        )
+    except (OSError, EOFError, KeyError, ValueError, pickle.PickleError):
+        return None
+    return data, index
+
+
+def save(directory, mode, data, index):
+    """
+    Writes a snapshot of the loaded `data` and `index` for `mode`
+    next to the CSV files.
+    Failures are ignored: the snapshot is only a cache.
+    """
+    header = {
+        "version": VERSION,
+        "mode": mode,
+        "indexed": index is not None,
+        "sources": source_stamps(directory),
+    }
+    path = os.path.join(directory, DATA_FILE)
+    try:
+        if index is not None:
+            save_index(os.path.join(directory, INDEX_FILE), index)
+        with open(path + ".tmp", "wb") as f:
+            pickle.dump(header, f, pickle.HIGHEST_PROTOCOL)
+            pickle.dump(data, f, pickle.HIGHEST_PROTOCOL)
+            if index is not None:
+                pickle.dump((index.person_ids, index.movie_ids), f,
+                            pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".tmp", path)
+    except OSError:
+        pass
+
+
+def save_index(path, index):
+    """
+    Writes the CSR arrays of `index` as a header of lengths
+    followed by the raw array contents.
+    """
+    arrays = (index.person_offsets, index.person_movies,
+              index.movie_offsets, index.movie_stars)
+    with open(path + ".tmp", "wb") as f:
+        f.write(INDEX_HEADER.pack(*(len(a) for a in arrays)))
+        for a in arrays:
+            array("i", a).tofile(f)
+    os.replace(path + ".tmp", path)
+
+
+def load_index(path, person_ids, movie_ids):
+    """
+    Memory-maps the CSR arrays written by `save_index`.
+    """
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    lengths = INDEX_HEADER.unpack_from(buffer)
+    itemsize = array("i").itemsize
+    if len(buffer) != INDEX_HEADER.size + sum(lengths) * itemsize:
+        raise ValueError("truncated index snapshot")
+
+    arrays = []
+    start = INDEX_HEADER.size
+    for length in lengths:
+        end = start + length * itemsize
+        arrays.append(memoryview(buffer)[start:end].cast("i"))
+        start = end
+    return CoStarIndex(person_ids, movie_ids, *arrays)
@@ -0,0 +1,225 @@
+import csv
+import itertools
+import operator
+import sys
+from array import array
+from collections.abc import Mapping
+
+from index import CoStarIndex
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Rows parsed per chunk by the streaming loader
+CHUNK_SIZE = 65536
+
+
+class PersonTable(Mapping):
+    """
+    Read-only, columnar replacement for the `people` dictionary.
+
+    Maps person_ids to a dictionary of: name, birth, built on access
+    from the name and birth columns.
+    """
+    __slots__ = ("person_index", "names", "births")
+
+    def __init__(self, person_index, names, births):
+        self.person_index = person_index
+        self.names = names
+        self.births = births
+
+    def __getitem__(self, person_id):
+        i = self.person_index[person_id]
+        birth = self.births[i]
+        return {"name": self.names[i], "birth": str(birth) if birth else ""}
+
+    def __iter__(self):
+        return iter(self.person_index)
+
+    def __len__(self):
+        return len(self.person_index)
+
+
+class MovieTable(Mapping):
+    """
+    Read-only, columnar replacement for the `movies` dictionary.
+
+    Maps movie_ids to a dictionary of: title, built on access
+    from the title column.
+    """
+    __slots__ = ("movie_index", "titles")
+
+    def __init__(self, movie_index, titles):
+        self.movie_index = movie_index
+        self.titles = titles
+
+    def __getitem__(self, movie_id):
+        return {"title": self.titles[self.movie_index[movie_id]]}
+
+    def __iter__(self):
+        return iter(self.movie_index)
+
+    def __len__(self):
+        return len(self.movie_index)
+
+
+def read_chunks(path, fields, chunk_size=CHUNK_SIZE):
+    """
+    Yields lists of at most `chunk_size` rows of a CSV file, each
+    row a tuple of the `fields` (two or more) columns found by name
+    in its header.
+    Rows missing any of these columns are skipped.
+    """
+    with open(path, encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        try:
+            positions = [header.index(field) for field in fields]
+        except ValueError:
+            raise ValueError(f"{path} needs the columns {', '.join(fields)}")
+        # Rows already hold just the fields, in order, in the usual layout
+        exact = header == list(fields)
+        width = max(positions) + 1
+        pick = operator.itemgetter(*positions)
+        while True:
+            chunk = list(itertools.islice(reader, chunk_size))
+            if not chunk:
+                return
+            if exact and all(len(row) == width for row in chunk):
+                yield chunk
+            else:
+                yield [pick(row) for row in chunk if len(row) >= width]
+
+
+def build_csr(keys, values, size):
+    """
+    Groups `values` by `keys` (both int arrays of the same length)
+    into CSR offsets and entries for `size` keys, with a counting sort.
+    """
+    offsets = array("i", bytes(array("i").itemsize * (size + 1)))
+    for key in keys:
+        offsets[key + 1] += 1
+    for i in range(size):
+        offsets[i + 1] += offsets[i]
+
+    entries = array("i", bytes(array("i").itemsize * len(values)))
+    cursor = offsets[:-1]
+    for key, value in zip(keys, values):
+        entries[cursor[key]] = value
+        cursor[key] += 1
+    return offsets, entries
+
+
+def unique_csr(offsets, entries):
+    """
+    Returns CSR offsets and entries without the entries repeated
+    within a key, keeping first occurrences in order, and the key
+    of each remaining entry.
+    """
+    unique_offsets = array("i", [0])
+    unique_entries = array("i")
+    keys = array("i")
+    for key in range(len(offsets) - 1):
+        group = entries[offsets[key]:offsets[key + 1]]
+        if len(group) > 1:
+            group = dict.fromkeys(group)
+        if group:
+            unique_entries.extend(group)
+            keys.extend(array("i", [key]) * len(group))
+        unique_offsets.append(len(unique_entries))
+    return unique_offsets, unique_entries, keys
+
+
+def load_streaming(directory, chunk_size=CHUNK_SIZE):
+    """
+    Loads the CSV files of `directory` chunk by chunk into columnar
+    stores with interned ids, without building a record per row.
+
+    Returns `names`, `people`, `movies` and the `CoStarIndex`.
+    """
+    names = {}
+    person_ids = []
+    person_index = {}
+    person_names = []
+    births = array("H")
+    for chunk in read_chunks(f"{directory}/people.csv",
+                             ("id", "name", "birth"), chunk_size):
+        for person_id, name, birth in chunk:
+            person_id = sys.intern(person_id)
+            person_index[person_id] = len(person_ids)
+            person_ids.append(person_id)
+            person_names.append(name)
+            births.append(int(birth) if birth.isdigit() else 0)
+            key = name.lower()
+            names[key] = names.get(key, ()) + (person_id,)
+
+    movie_ids = []
+    movie_index = {}
+    titles = []
+    for chunk in read_chunks(f"{directory}/movies.csv",
+                             ("id", "title", "year"), chunk_size):
+        for movie_id, title, _ in chunk:
+            movie_id = sys.intern(movie_id)
+            movie_index[movie_id] = len(movie_ids)
+            movie_ids.append(movie_id)
+            titles.append(title)
+
+    # Keep the star edges as two int columns until they are grouped
+    edge_people = array("i")
+    edge_movies = array("i")
+    for chunk in read_chunks(f"{directory}/stars.csv",
+                             ("person_id", "movie_id"), chunk_size):
+        for person_id, movie_id in chunk:
+            person = person_index.get(person_id)
+            movie = movie_index.get(movie_id)
+            if person is not None and movie is not None:
+                edge_people.append(person)
+                edge_movies.append(movie)
+
+    # Repeated star rows are dropped, as the sets of the dict loader do
+    person_offsets, person_movies, edge_people = unique_csr(*build_csr(
+        edge_people, edge_movies, len(person_ids)
+    ))
+    del edge_movies
+    movie_offsets, movie_stars = build_csr(
+        person_movies, edge_people, len(movie_ids)
+    )
+    del edge_people
+
+    index = CoStarIndex(person_ids, movie_ids, person_offsets, person_movies,
+                        movie_offsets, movie_stars,
+                        person_index=person_index, movie_index=movie_index)
+    people = PersonTable(person_index, person_names, births)
+    movies = MovieTable(movie_index, titles)
+    return names, people, movies, index
+
+
+def columns(names, people, movies):
+    """
+    Returns the columns needed to rebuild the tables with `restore`.
+    """
+    return names, people.names, people.births, movies.titles
+
+
+def restore(columns, index):
+    """
+    Rebuilds `names`, `people` and `movies` from `columns`
+    around an already loaded `CoStarIndex`.
+    """
+    names, person_names, births, titles = columns
+    people = PersonTable(index.person_index, person_names, births)
+    movies = MovieTable(index.movie_index, titles)
+    return names, people, movies
+
+
+def peak_memory():
+    """
+    Returns the peak resident memory of the process in bytes,
+    or None where it cannot be measured.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
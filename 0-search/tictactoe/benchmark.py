@@ -0,0 +1,71 @@
+"""
+Compares the work done by the tictactoe search methods
+"""
+
+import sys
+
+import tictactoe as ttt
+
+X = ttt.X
+O = ttt.O
+EMPTY = ttt.EMPTY
+
+POSITIONS = [
+    ("empty board", ttt.initial_state()),
+    ("X in a corner", [[X, EMPTY, EMPTY],
+                       [EMPTY, EMPTY, EMPTY],
+                       [EMPTY, EMPTY, EMPTY]]),
+    ("O to block", [[X, EMPTY, EMPTY],
+                    [EMPTY, O, EMPTY],
+                    [EMPTY, EMPTY, X]]),
+]
+
+METHODS = ["minimax", "alphabeta", "transposition", "bitboard", "book"]
+
+
+def measure(board, method, log=None):
+    """
+    Returns the chosen action and the SearchStats of one minimax call,
+    starting from an empty transposition table.
+    """
+    ttt.transposition_table.clear()
+    stats = ttt.SearchStats(log=log)
+    action = ttt.minimax(board, method=method, stats=stats)
+    return action, stats
+
+
+def value(board, action):
+    """
+    Returns the minimax value of playing action on the board.
+    """
+    new_board = ttt.result(board, action)
+    if ttt.terminal(new_board):
+        return ttt.utility(new_board)
+    if ttt.player(new_board) == X:
+        return ttt.alphabeta_max_value(new_board, -2, 2)[1]
+    return ttt.alphabeta_min_value(new_board, -2, 2)[1]
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python benchmark.py [log.jsonl]")
+    log = sys.argv[1] if len(sys.argv) == 2 else None
+
+    for name, board in POSITIONS:
+        print(name)
+        baseline = None
+        for method in METHODS:
+            action, stats = measure(board, method, log)
+            action_value = value(board, action)
+            if baseline is None:
+                baseline = (stats.nodes, action_value)
+            elif action_value != baseline[1]:
+                raise Exception(f"{method} chose a suboptimal action")
+            print(f"    {method:<14} action={action} value={action_value:+d} "
+                  f"nodes={stats.nodes:>7} ({stats.nodes / baseline[0]:6.1%}) "
+                  f"cutoffs={stats.cutoffs:>5} hits={stats.cache_hits:>5} "
+                  f"time={stats.seconds * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
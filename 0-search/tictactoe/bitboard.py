@@ -0,0 +1,201 @@
+"""
+Tic Tac Toe engine on bitboards
+
+Each side's marks are a 9-bit integer, cell (i, j) being bit 3 * i + j.
+The list-of-lists functions at the bottom mirror the tictactoe API.
+"""
+
+X = "X"
+O = "O"
+EMPTY = None
+
+FULL = 0b111111111
+
+WIN_MASKS = [
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100,
+]
+
+# WINS[mask] is True if the marks in mask complete a line
+WINS = [any(mask & line == line for line in WIN_MASKS) for mask in range(512)]
+
+# Center first, then corners, then edges
+MOVE_BITS = [1 << cell for cell in (4, 0, 2, 6, 8, 1, 3, 5, 7)]
+
+# tictactoe.SearchStats of the instrumented search in progress, if any
+search_stats = None
+
+
+def encode(board):
+    """
+    Returns the (x, o) bitboards of a list-of-lists board.
+    """
+    x = o = 0
+    for i in range(3):
+        for j in range(3):
+            if board[i][j] == X:
+                x |= 1 << (3 * i + j)
+            elif board[i][j] == O:
+                o |= 1 << (3 * i + j)
+    return x, o
+
+
+def decode(x, o):
+    """
+    Returns the list-of-lists board of the (x, o) bitboards.
+    """
+    return [[X if x >> (3 * i + j) & 1 else O if o >> (3 * i + j) & 1 else EMPTY
+             for j in range(3)]
+            for i in range(3)]
+
+
+def to_move(x, o):
+    """
+    Returns the player who has the next turn.
+    """
+    return X if (x | o).bit_count() % 2 == 0 else O
+
+
+def free_cells(x, o):
+    """
+    Yields the bit of each empty cell, lowest first.
+    """
+    free = ~(x | o) & FULL
+    while free:
+        bit = free & -free
+        yield bit
+        free ^= bit
+
+
+def win_owner(x, o):
+    """
+    Returns the winner of the bitboards, if there is one.
+    """
+    if WINS[x]:
+        return X
+    if WINS[o]:
+        return O
+    return None
+
+
+def negamax(me, opponent, alpha, beta):
+    """
+    Returns the best move bit for the player whose marks are `me`
+    and its value from that player's point of view, with alpha-beta.
+    Assumes neither side has won yet.
+    """
+    occupied = me | opponent
+    if search_stats is not None:
+        search_stats.visit(occupied.bit_count())
+    if occupied == FULL:
+        if search_stats is not None:
+            search_stats.terminals += 1
+        return None, 0
+
+    best = None
+    value = -2
+    for bit in MOVE_BITS:
+        if occupied & bit:
+            continue
+        mine = me | bit
+        if WINS[mine]:
+            if search_stats is not None:
+                search_stats.terminals += 1
+            return bit, 1
+        _, reply = negamax(opponent, mine, -beta, -max(alpha, value))
+        if -reply > value:
+            best = bit
+            value = -reply
+            if value >= beta:
+                if search_stats is not None:
+                    search_stats.cutoffs += 1
+                break
+    return best, value
+
+
+def best_move(x, o):
+    """
+    Returns the optimal (i, j) action for the player to move and the
+    value of the position (1 if X wins, -1 if O wins, 0 otherwise).
+    """
+    if win_owner(x, o) is not None or x | o == FULL:
+        return None, utility_bits(x, o)
+    if to_move(x, o) == X:
+        bit, value = negamax(x, o, -2, 2)
+    else:
+        bit, value = negamax(o, x, -2, 2)
+        value = -value
+    return divmod(bit.bit_length() - 1, 3), value
+
+
+def utility_bits(x, o):
+    """
+    Returns 1 if X has won, -1 if O has won, 0 otherwise.
+    """
+    return 1 if WINS[x] else -1 if WINS[o] else 0
+
+
+def initial_state():
+    """
+    Returns starting state of the board.
+    """
+    return decode(0, 0)
+
+
+def player(board):
+    """
+    Returns player who has the next turn on a board.
+    """
+    return to_move(*encode(board))
+
+
+def actions(board):
+    """
+    Returns set of all possible actions (i, j) available on the board.
+    """
+    return {divmod(bit.bit_length() - 1, 3)
+            for bit in free_cells(*encode(board))}
+
+
+def result(board, action):
+    """
+    Returns the board that results from making move (i, j) on the board.
+    """
+    i, j = action
+    x, o = encode(board)
+    bit = 1 << (3 * i + j)
+    if (x | o) & bit:
+        raise NameError("Cell (" + str(i) + ", " + str(j) + ") is already occupied")
+    if to_move(x, o) == X:
+        return decode(x | bit, o)
+    return decode(x, o | bit)
+
+
+def winner(board):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    return win_owner(*encode(board))
+
+
+def terminal(board):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    x, o = encode(board)
+    return WINS[x] or WINS[o] or x | o == FULL
+
+
+def utility(board):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    return utility_bits(*encode(board))
+
+
+def minimax(board):
+    """
+    Returns the optimal action for the current player on the board.
+    """
+    return best_move(*encode(board))[0]
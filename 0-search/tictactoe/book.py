@@ -0,0 +1,54 @@
+"""
+Writes the tictactoe opening book: the optimal move and value
+of every position reachable from the empty board
+"""
+
+import os
+import sys
+import time
+
+import bitboard
+import tictactoe as ttt
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python book.py [path]")
+    path = sys.argv[1] if len(sys.argv) == 2 else ttt.BOOK_PATH
+
+    start = time.perf_counter()
+    entries = solve()
+    with open(path, "wb") as f:
+        f.write(entries)
+    print(f"Solved {ttt.BOOK_SIZE - entries.count(ttt.UNREACHABLE)} positions "
+          f"in {time.perf_counter() - start:.2f} s")
+    print(f"Wrote {path}: {os.path.getsize(path)} bytes")
+
+    start = time.perf_counter()
+    ttt.load_book(path)
+    ttt.minimax(ttt.initial_state())
+    print(f"Loaded and answered in {(time.perf_counter() - start) * 1000:.2f} ms")
+
+
+def solve():
+    """
+    Returns the book bytes, solving each reachable position once.
+    """
+    entries = bytearray([ttt.UNREACHABLE]) * ttt.BOOK_SIZE
+    stack = [ttt.initial_state()]
+    while stack:
+        board = stack.pop()
+        index = ttt.board_index(board)
+        if entries[index] != ttt.UNREACHABLE:
+            continue
+        action, value = bitboard.best_move(*bitboard.encode(board))
+        move = ttt.NO_MOVE if action is None else action[0] * 3 + action[1]
+        entries[index] = (value + 1) << 4 | move
+        if action is not None:
+            for action in ttt.actions(board):
+                stack.append(ttt.result(board, action))
+    return entries
+
+
+if __name__ == "__main__":
+    main()
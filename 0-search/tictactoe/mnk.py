@@ -0,0 +1,461 @@
+"""
+Generalized m,n,k game: an m x n board where k in a row wins
+
+Uses the same function names as tictactoe, with the board size read
+from the board and the winning length passed as `k`. minimax runs
+iterative-deepening alpha-beta within a time budget and scores the
+positions at its depth limit with a heuristic.
+"""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from functools import lru_cache
+
+X = "X"
+O = "O"
+EMPTY = None
+
+K = 3
+
+# Seconds minimax may spend searching by default
+TIME_BUDGET = 1.0
+
+# Nodes searched between two clock checks
+CLOCK_INTERVAL = 64
+
+DIRECTIONS = [(0, 1), (1, 0), (1, 1), (1, -1)]
+
+# Only empty cells this close to a mark are searched
+REACH = 2
+
+# Process pools of parallel_search, by number of workers
+executors = {}
+
+# Best root value found so far in the current parallel depth,
+# shared by the workers of a pool
+shared_bound = None
+
+
+class SearchTimeout(Exception):
+    """
+    Raised inside the search when the time budget runs out.
+    """
+
+
+def initial_state(m=3, n=3):
+    """
+    Returns starting state of an m x n board.
+    """
+    return [[EMPTY] * n for _ in range(m)]
+
+
+def player(board):
+    """
+    Returns player who has the next turn on a board.
+    """
+    marks = sum(cell is not EMPTY for row in board for cell in row)
+    return X if marks % 2 == 0 else O
+
+
+def actions(board):
+    """
+    Returns set of all possible actions (i, j) available on the board.
+    """
+    return {(i, j)
+            for i, row in enumerate(board)
+            for j, cell in enumerate(row)
+            if cell == EMPTY}
+
+
+def result(board, action):
+    """
+    Returns the board that results from making move (i, j) on the board.
+    """
+    i, j = action
+    if board[i][j] != EMPTY:
+        raise NameError("Cell (" + str(i) + ", " + str(j) + ") is already occupied")
+    new_board = [list(row) for row in board]
+    new_board[i][j] = player(board)
+    return new_board
+
+
+def completes_line(board, i, j, k=K):
+    """
+    Returns True if the mark at (i, j) is part of k in a row.
+    """
+    mark = board[i][j]
+    m, n = len(board), len(board[0])
+    for di, dj in DIRECTIONS:
+        count = 1
+        for sign in (1, -1):
+            r, c = i + sign * di, j + sign * dj
+            while 0 <= r < m and 0 <= c < n and board[r][c] == mark:
+                count += 1
+                r, c = r + sign * di, c + sign * dj
+        if count >= k:
+            return True
+    return False
+
+
+def winner(board, k=K):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    for i, row in enumerate(board):
+        for j, cell in enumerate(row):
+            if cell is not EMPTY and completes_line(board, i, j, k):
+                return cell
+    return None
+
+
+def terminal(board, k=K):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    if winner(board, k) is not None:
+        return True
+    return all(cell is not EMPTY for row in board for cell in row)
+
+
+def utility(board, k=K):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    res = winner(board, k)
+    if res == X:
+        return 1
+    elif res == O:
+        return -1
+    else:
+        return 0
+
+
+@lru_cache(maxsize=None)
+def windows(m, n, k):
+    """
+    Returns every line of k cells on an m x n board.
+    """
+    lines = []
+    for i in range(m):
+        for j in range(n):
+            for di, dj in DIRECTIONS:
+                end_i, end_j = i + (k - 1) * di, j + (k - 1) * dj
+                if 0 <= end_i < m and 0 <= end_j < n:
+                    lines.append(tuple((i + s * di, j + s * dj)
+                                       for s in range(k)))
+    return lines
+
+
+def evaluate(board, k=K):
+    """
+    Returns a heuristic value of a non-terminal board in (-1, 1),
+    positive when X is better placed. Each line still open to only
+    one player counts for that player, more so the fuller it is.
+    """
+    score = 0
+    for line in windows(len(board), len(board[0]), k):
+        x = o = 0
+        for i, j in line:
+            if board[i][j] == X:
+                x += 1
+            elif board[i][j] == O:
+                o += 1
+        if o == 0 and x:
+            score += 4 ** x
+        elif x == 0 and o:
+            score -= 4 ** o
+    return 0.99 * score / (abs(score) + 4 ** k)
+
+
+def ordered_actions(board, first=None):
+    """
+    Returns the empty cells within REACH of a mark (or all of them on
+    an empty board) with `first` in front, then the cells with the most
+    marked neighbors closest to the center.
+    """
+    m, n = len(board), len(board[0])
+    marked = [(i, j) for i, row in enumerate(board)
+              for j, cell in enumerate(row) if cell is not EMPTY]
+    if marked:
+        candidates = {(r, c)
+                      for i, j in marked
+                      for r in range(max(i - REACH, 0), min(i + REACH + 1, m))
+                      for c in range(max(j - REACH, 0), min(j + REACH + 1, n))
+                      if board[r][c] == EMPTY}
+    else:
+        candidates = actions(board)
+
+    def priority(action):
+        i, j = action
+        neighbors = sum(
+            board[r][c] is not EMPTY
+            for r in range(max(i - 1, 0), min(i + 2, m))
+            for c in range(max(j - 1, 0), min(j + 2, n))
+        )
+        return (action != first, -neighbors,
+                abs(2 * i - m + 1) + abs(2 * j - n + 1))
+
+    return sorted(candidates, key=priority)
+
+
+def minimax(board, k=K, time_budget=TIME_BUDGET, max_depth=None,
+            workers=1):
+    """
+    Returns the optimal action for the current player on the board,
+    as far as iterative deepening can see within `time_budget` seconds
+    (and `max_depth` plies, if given). With more than one worker,
+    the root actions are searched in parallel.
+    """
+    if terminal(board, k):
+        return None
+    if workers != 1:
+        return parallel_search(board, k, time_budget, max_depth, workers)[0]
+    return search(board, k, time_budget, max_depth)[0]
+
+
+def search(board, k=K, time_budget=TIME_BUDGET, max_depth=None):
+    """
+    Runs iterative-deepening alpha-beta from the board and returns
+    the best action, its value and the deepest completed depth.
+    """
+    deadline = time.perf_counter() + time_budget
+    board = [list(row) for row in board]
+    empty = sum(cell is EMPTY for row in board for cell in row)
+    limit = empty if max_depth is None else min(max_depth, empty)
+    maximizing = player(board) == X
+
+    best = ordered_actions(board)[0]
+    value = 0
+    depth = 0
+    state = {"nodes": 0, "deadline": deadline}
+    while depth < limit:
+        try:
+            action, action_value = root_search(board, k, depth + 1,
+                                               maximizing, best, state)
+        except SearchTimeout:
+            break
+        depth += 1
+        best, value = action, action_value
+
+        # A proven result cannot change at greater depth
+        if abs(value) == 1:
+            break
+    return best, value, depth
+
+
+def root_search(board, k, depth, maximizing, first, state):
+    """
+    Returns the best action and value at the root, searching
+    `depth` plies with the previous best action first.
+    """
+    mark = X if maximizing else O
+    best = None
+    value = -2 if maximizing else 2
+    alpha, beta = -2, 2
+    for i, j in ordered_actions(board, first):
+        board[i][j] = mark
+        try:
+            new_value = alphabeta(board, k, i, j, depth - 1,
+                                  alpha, beta, not maximizing, state)
+        finally:
+            board[i][j] = EMPTY
+        if new_value > value if maximizing else new_value < value:
+            best, value = (i, j), new_value
+        if maximizing:
+            alpha = max(alpha, value)
+        else:
+            beta = min(beta, value)
+    return best, value
+
+
+def alphabeta(board, k, i, j, depth, alpha, beta, maximizing, state):
+    """
+    Returns the value of the board after the last move at (i, j),
+    searching `depth` more plies within (alpha, beta). Moves are made
+    and undone in place.
+    """
+    state["nodes"] += 1
+    if (state["nodes"] % CLOCK_INTERVAL == 0
+            and time.perf_counter() > state["deadline"]):
+        raise SearchTimeout
+
+    if completes_line(board, i, j, k):
+        return 1 if board[i][j] == X else -1
+    moves = ordered_actions(board)
+    if not moves:
+        return 0
+    if depth == 0:
+        return evaluate(board, k)
+
+    mark = X if maximizing else O
+    value = -2 if maximizing else 2
+    for r, c in moves:
+        board[r][c] = mark
+        try:
+            new_value = alphabeta(board, k, r, c, depth - 1,
+                                  alpha, beta, not maximizing, state)
+        finally:
+            board[r][c] = EMPTY
+        if maximizing:
+            value = max(value, new_value)
+            alpha = max(alpha, value)
+        else:
+            value = min(value, new_value)
+            beta = min(beta, value)
+        if alpha >= beta:
+            break
+    return value
+
+
+def symmetries(m, n):
+    """
+    Returns the rotations/reflections of an m x n board as functions
+    mapping a cell (i, j) to its image.
+    """
+    transforms = [
+        lambda i, j: (i, j),
+        lambda i, j: (i, n - 1 - j),
+        lambda i, j: (m - 1 - i, j),
+        lambda i, j: (m - 1 - i, n - 1 - j),
+    ]
+    if m == n:
+        transforms += [
+            lambda i, j: (j, i),
+            lambda i, j: (j, m - 1 - i),
+            lambda i, j: (n - 1 - j, i),
+            lambda i, j: (n - 1 - j, m - 1 - i),
+        ]
+    return transforms
+
+
+def symmetry_classes(board, moves):
+    """
+    Returns one representative of each class of moves that lead to
+    positions equal up to a symmetry of the board.
+    """
+    m, n = len(board), len(board[0])
+    invariant = [
+        transform for transform in symmetries(m, n)
+        if all(board[r][c] == board[i][j]
+               for i in range(m) for j in range(n)
+               for r, c in [transform(i, j)])
+    ]
+    seen = set()
+    representatives = []
+    for move in moves:
+        if move in seen:
+            continue
+        representatives.append(move)
+        seen.update(transform(*move) for transform in invariant)
+    return representatives
+
+
+def init_worker(bound):
+    """
+    Shares the root bound with a pool worker.
+    """
+    global shared_bound
+    shared_bound = bound
+
+
+def get_executor(workers):
+    """
+    Returns a process pool of `workers` processes, reused across calls.
+    """
+    if workers not in executors:
+        bound = multiprocessing.Value("d", 0.0)
+        executors[workers] = (
+            ProcessPoolExecutor(workers, initializer=init_worker,
+                                initargs=(bound,)),
+            bound
+        )
+    return executors[workers]
+
+
+def root_child_value(board, k, action, depth, maximizing, deadline):
+    """
+    Searches one root action in a pool worker until the wall-clock
+    `deadline` (a time.time() value shared by all workers), narrowing
+    its window with the best root value already found by other workers.
+
+    Returns the action, its value and whether the value is exact
+    rather than a bound, or None if time ran out.
+    """
+    i, j = action
+    remaining = deadline - time.time()
+    state = {"nodes": 0, "deadline": time.perf_counter() + remaining}
+    with shared_bound.get_lock():
+        bound = shared_bound.value
+    alpha, beta = (bound, 2) if maximizing else (-2, bound)
+
+    board[i][j] = X if maximizing else O
+    try:
+        value = alphabeta(board, k, i, j, depth - 1,
+                          alpha, beta, not maximizing, state)
+    except SearchTimeout:
+        return None
+
+    with shared_bound.get_lock():
+        if value > shared_bound.value if maximizing else value < shared_bound.value:
+            shared_bound.value = value
+
+    # A value at the bound only shows the action is no better than it
+    exact = value > alpha if maximizing else value < beta
+    return action, value, exact
+
+
+def parallel_search(board, k=K, time_budget=TIME_BUDGET, max_depth=None,
+                    workers=None):
+    """
+    Runs iterative-deepening alpha-beta like `search`, evaluating
+    the root actions of each depth in a process pool. Actions leading
+    to symmetric positions are searched only once.
+    """
+    workers = workers or os.cpu_count()
+    executor, bound = get_executor(workers)
+    # Wall-clock time, comparable across processes
+    deadline = time.time() + time_budget
+    board = [list(row) for row in board]
+    empty = sum(cell is EMPTY for row in board for cell in row)
+    limit = empty if max_depth is None else min(max_depth, empty)
+    maximizing = player(board) == X
+
+    best = ordered_actions(board)[0]
+    value = 0
+    depth = 0
+    while depth < limit:
+        moves = symmetry_classes(board, ordered_actions(board, best))
+        with bound.get_lock():
+            bound.value = -2 if maximizing else 2
+        futures = [
+            executor.submit(root_child_value, board, k, move, depth + 1,
+                            maximizing, deadline)
+            for move in moves
+        ]
+
+        # Running tasks stop at the deadline themselves; queued ones
+        # are cancelled so the next call does not wait behind them
+        timeout = None if deadline == float("inf") else max(0, deadline - time.time())
+        _, pending = wait(futures, timeout=timeout)
+        if pending:
+            for future in pending:
+                future.cancel()
+            break
+        results = [future.result() for future in futures]
+        if None in results:
+            break
+        depth += 1
+
+        # Keep the first exact action of the best value, in search order
+        best = None
+        for action, action_value, exact in results:
+            if exact and (best is None or (action_value > value if maximizing
+                                           else action_value < value)):
+                best, value = action, action_value
+
+        # A proven result cannot change at greater depth
+        if abs(value) == 1:
+            break
+    return best, value, depth
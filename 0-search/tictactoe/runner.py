@@ -1,11 +1,17 @@
 import pygame
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 import tictactoe as ttt
 
 pygame.init()
 size = width, height = 600, 400
+fps = 60
+clock = pygame.time.Clock()
+
+# AI moves are computed off the render loop and polled every frame
+executor = ThreadPoolExecutor(max_workers=1)
 
 # Colors
 black = (0, 0, 0)
@@ -19,14 +25,40 @@ moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
 
 user = None
 board = ttt.initial_state()
-ai_turn = False
+ai_future = None
+ai_board = None
+
+
+def cancel_ai():
+    """
+    Discards the AI move being computed, if any.
+
+    A search already running cannot be interrupted, so it is left to
+    finish on its own thread and later moves go to a fresh executor
+    instead of queueing behind it.
+    """
+    global executor, ai_future, ai_board
+    if ai_future is not None and not ai_future.cancel():
+        executor.shutdown(wait=False)
+        executor = ThreadPoolExecutor(max_workers=1)
+    ai_future = None
+    ai_board = None
+
 
 while True:
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            cancel_ai()
+            executor.shutdown(wait=False)
             sys.exit()
 
+        # Escape resets the game, even while the computer is thinking
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+            cancel_ai()
+            user = None
+            board = ttt.initial_state()
+
     screen.fill(black)
 
     # Let user choose a player.
@@ -102,7 +134,8 @@ while True:
         elif user == player:
             title = f"Play as {user}"
         else:
-            title = f"Computer thinking..."
+            dots = "." * (pygame.time.get_ticks() // 300 % 3 + 1)
+            title = f"Computer thinking{dots:<3}"
         title = largeFont.render(title, True, white)
         titleRect = title.get_rect()
         titleRect.center = ((width / 2), 30)
@@ -110,13 +143,15 @@ while True:
 
         # Check for AI move
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+            if ai_future is None:
+                ai_board = board
+                ai_future = executor.submit(ttt.minimax, board)
+            elif ai_future.done():
+                move = ai_future.result()
+                if ai_board is board:
+                    board = ttt.result(board, move)
+                ai_future = None
+                ai_board = None
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
@@ -139,8 +174,9 @@ while True:
                 mouse = pygame.mouse.get_pos()
                 if againButton.collidepoint(mouse):
                     time.sleep(0.2)
+                    cancel_ai()
                     user = None
                     board = ttt.initial_state()
-                    ai_turn = False
 
     pygame.display.flip()
+    clock.tick(fps)
@@ -0,0 +1,117 @@
+"""
+Headless engine-vs-engine tictactoe games
+
+Plays many games across a process pool, each starting from random
+opening moves drawn from its own seed, and reports throughput,
+results and per-move latency percentiles.
+"""
+
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import tictactoe as ttt
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run tictactoe self-play.")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--x", default="book", choices=ttt.METHODS,
+                        help="minimax method for X")
+    parser.add_argument("--o", default="book", choices=ttt.METHODS,
+                        help="minimax method for O")
+    parser.add_argument("--openings", type=int, default=2,
+                        help="random moves played before the engines")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results, latencies = run(args.games, args.x, args.o, args.openings,
+                             args.seed, args.workers)
+    elapsed = time.perf_counter() - start
+
+    games = sum(results.values())
+    print(f"Games: {games} in {elapsed:.2f} s ({games / elapsed:.1f} games/s)")
+    print(f"X wins: {results[ttt.X]}, O wins: {results[ttt.O]}, "
+          f"draws: {results[None]} ({results[None] / games:.1%})")
+    if latencies:
+        latencies.sort()
+        summary = ", ".join(
+            f"p{p}={percentile(latencies, p) * 1000:.3f}"
+            for p in (50, 90, 99)
+        )
+        print(f"Move latency (ms): {summary}, max={latencies[-1] * 1000:.3f}")
+
+
+def run(games, x_method, o_method, openings, seed, workers):
+    """
+    Plays `games` games over `workers` processes and returns the
+    count of results by winner (None for draws) and every engine
+    move latency in seconds.
+    """
+    seeds = list(range(seed, seed + games))
+    batches = [seeds[i::workers] for i in range(workers) if seeds[i::workers]]
+    results = {ttt.X: 0, ttt.O: 0, None: 0}
+    latencies = []
+    with ProcessPoolExecutor(workers) as executor:
+        futures = [
+            executor.submit(play_batch, batch, x_method, o_method, openings)
+            for batch in batches
+        ]
+        for future in futures:
+            batch_results, batch_latencies = future.result()
+            for winner in batch_results:
+                results[winner] += 1
+            latencies.extend(batch_latencies)
+    return results, latencies
+
+
+def play_batch(seeds, x_method, o_method, openings):
+    """
+    Plays one game per seed and returns the winners
+    and the engine move latencies.
+    """
+    winners = []
+    latencies = []
+    for seed in seeds:
+        winner, game_latencies = play(seed, x_method, o_method, openings)
+        winners.append(winner)
+        latencies.extend(game_latencies)
+    return winners, latencies
+
+
+def play(seed, x_method, o_method, openings):
+    """
+    Plays one game: `openings` random moves, then the engines.
+    Returns the winner (None for a draw) and the engine move latencies.
+    """
+    rng = random.Random(seed)
+    board = ttt.initial_state()
+    latencies = []
+    plies = 0
+    while not ttt.terminal(board):
+        if plies < openings:
+            action = rng.choice(sorted(ttt.actions(board)))
+        else:
+            method = x_method if ttt.player(board) == ttt.X else o_method
+            start = time.perf_counter()
+            action = ttt.minimax(board, method=method)
+            latencies.append(time.perf_counter() - start)
+        board = ttt.result(board, action)
+        plies += 1
+    return ttt.winner(board), latencies
+
+
+def percentile(values, p):
+    """
+    Returns the p-th percentile of sorted values (nearest rank).
+    """
+    rank = max(0, -(-len(values) * p // 100) - 1)
+    return values[rank]
+
+
+if __name__ == "__main__":
+    main()
@@ -2,12 +2,112 @@
 Tic Tac Toe Player
 """
 
+import json
+import os
+import time
 from copy import deepcopy
 
+import bitboard
+import mnk
+
 X = "X"
 O = "O"
 EMPTY = None
 
+# Center first, then corners, then edges: strongest moves are tried first
+MOVE_ORDER = [(1, 1),
+              (0, 0), (0, 2), (2, 0), (2, 2),
+              (0, 1), (1, 0), (1, 2), (2, 1)]
+
+
+def symmetries():
+    """
+    Returns the 8 rotations/reflections of the board as permutations p
+    of the cells 0..8, the transformed board holding cell p[k] at k.
+    """
+    rotate = [6, 3, 0, 7, 4, 1, 8, 5, 2]
+    reflect = [2, 1, 0, 5, 4, 3, 8, 7, 6]
+    perms = []
+    perm = list(range(9))
+    for _ in range(4):
+        perms.append(perm)
+        perms.append([perm[k] for k in reflect])
+        perm = [perm[k] for k in rotate]
+    return perms
+
+
+SYMMETRIES = symmetries()
+
+# Maps canonical positions to their (value, best move in canonical cells),
+# shared by every minimax call in the process
+transposition_table = {}
+
+# Opening book written by book.py: one byte per board, indexed by the
+# board read as a base-3 number, holding the best cell (0-8, or NO_MOVE)
+# in the low 4 bits and the value + 1 in the next 2 bits
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+BOOK_SIZE = 3 ** 9
+NO_MOVE = 0xF
+UNREACHABLE = 0xFF
+
+# Search used by the "book" method when the book file is missing
+BOOK_FALLBACK = "transposition"
+
+# Loaded book bytes, False until load_book is first called
+book = False
+
+# Search methods accepted by minimax
+METHODS = ("book", "bitboard", "parallel", "transposition", "alphabeta",
+           "minimax")
+
+# Statistics of the minimax call in progress, if instrumented
+search_stats = None
+
+
+class SearchStats():
+    """
+    Work done by one instrumented minimax call.
+
+    If `log` is a path, each call appends its statistics to it
+    as a JSON line.
+    """
+
+    def __init__(self, log=None):
+        self.log = log
+        self.reset()
+
+    def reset(self, method=None, root_marks=0):
+        self.method = method
+        self.root_marks = root_marks
+        self.nodes = 0
+        self.terminals = 0
+        self.cutoffs = 0
+        self.cache_hits = 0
+        self.max_depth = 0
+        self.seconds = 0.0
+
+    def visit(self, marks):
+        """Counts a searched position holding `marks` marks."""
+        self.nodes += 1
+        if marks - self.root_marks > self.max_depth:
+            self.max_depth = marks - self.root_marks
+
+    def as_dict(self):
+        return {
+            "method": self.method,
+            "nodes": self.nodes,
+            "terminals": self.terminals,
+            "cutoffs": self.cutoffs,
+            "cache_hits": self.cache_hits,
+            "max_depth": self.max_depth,
+            "seconds": self.seconds,
+        }
+
+    def write(self):
+        """Appends the statistics to `log` as a JSON line."""
+        with open(self.log, "a", encoding="utf-8") as f:
+            f.write(json.dumps(self.as_dict()) + "\n")
+
 
 def initial_state():
     """
@@ -97,19 +197,86 @@ def utility(board):
         return 0
 
 
-def minimax(board):
+def minimax(board, method="book", stats=None):
     """
     Returns the optimal action for the current player on the board.
+
+    `method` selects the search: "book" reads the precomputed opening
+    book, falling back to BOOK_FALLBACK if it is missing; "minimax"
+    explores the full game tree; "alphabeta" prunes it with alpha-beta
+    and move ordering; "transposition" solves each position up to
+    symmetry only once; "bitboard" runs alpha-beta on the bitboard
+    engine; and "parallel" searches the root actions, up to symmetry,
+    in a process pool.
+
+    If `stats` is a SearchStats, it is reset and filled with the work
+    done by this call. The "parallel" method only records wall time.
     """
+    global search_stats
+    if stats is None:
+        return search(board, method)
+
+    stats.reset(method, marks(board))
+    search_stats = bitboard.search_stats = stats
+    start = time.perf_counter()
+    try:
+        return search(board, method)
+    finally:
+        stats.seconds = time.perf_counter() - start
+        search_stats = bitboard.search_stats = None
+        if stats.log is not None:
+            stats.write()
+
+
+def marks(board):
+    """
+    Returns the number of marks on the board.
+    """
+    return sum(cell is not EMPTY for row in board for cell in row)
+
+
+def search(board, method):
+    """
+    Returns the optimal action for the current player on the board,
+    using the search `method` described in `minimax`.
+    """
+    if method not in METHODS:
+        raise ValueError(f"unknown minimax method: {method}")
     if terminal(board):
         return None
+    if method == "book":
+        entry = book_entry(board)
+        if entry is None:
+            return search(board, BOOK_FALLBACK)
+        if search_stats is not None:
+            search_stats.cache_hits += 1
+        return divmod(entry & NO_MOVE, 3)
+    if method == "bitboard":
+        return bitboard.minimax(board)
+    if method == "parallel":
+        return mnk.minimax(board, k=3, time_budget=float("inf"), workers=None)
+    if method == "transposition":
+        return transposition_value(board)[0]
+    if method == "alphabeta":
+        if player(board) == X:
+            return alphabeta_max_value(board, -2, 2)[0]
+        return alphabeta_min_value(board, -2, 2)[0]
     return max_value(board)[0] if player(board) == X else min_value(board)[0]
 
 
+def ordered_actions(board):
+    """
+    Returns the available actions on the board in MOVE_ORDER.
+    """
+    return [(i, j) for i, j in MOVE_ORDER if board[i][j] == EMPTY]
+
+
 def max_value(board):
     """
     Returns the action with the higher value associated and the said value
     """
+    if search_stats is not None:
+        search_stats.visit(marks(board))
     optimalAction = None
     value = -2
 
@@ -117,6 +284,8 @@ def max_value(board):
         new_board = result(board, action)
         if terminal(new_board):
             new_value = utility(new_board)
+            if search_stats is not None:
+                search_stats.terminals += 1
         else:
             _, new_value = min_value(new_board)
         if new_value > value:
@@ -129,6 +298,8 @@ def min_value(board):
     """
     Returns the action with the lowest value associated and the said value
     """
+    if search_stats is not None:
+        search_stats.visit(marks(board))
     optimalAction = None
     value = 2
 
@@ -136,9 +307,160 @@ def min_value(board):
         new_board = result(board, action)
         if terminal(new_board):
             new_value = utility(new_board)
+            if search_stats is not None:
+                search_stats.terminals += 1
         else:
             _, new_value = max_value(new_board)
         if new_value < value:
             optimalAction = action
             value = new_value
     return (optimalAction, value)
+
+
+def alphabeta_max_value(board, alpha, beta):
+    """
+    Returns the action with the higher value associated and the said value,
+    skipping subtrees that cannot change the result within (alpha, beta)
+    """
+    if search_stats is not None:
+        search_stats.visit(marks(board))
+    optimalAction = None
+    value = -2
+
+    for action in ordered_actions(board):
+        new_board = result(board, action)
+        if terminal(new_board):
+            new_value = utility(new_board)
+            if search_stats is not None:
+                search_stats.terminals += 1
+        else:
+            _, new_value = alphabeta_min_value(new_board, max(alpha, value), beta)
+        if new_value > value:
+            optimalAction = action
+            value = new_value
+
+        # A win cannot be improved on, and the opponent avoids values >= beta
+        if value == 1 or value >= beta:
+            if search_stats is not None:
+                search_stats.cutoffs += 1
+            break
+    return (optimalAction, value)
+
+
+def alphabeta_min_value(board, alpha, beta):
+    """
+    Returns the action with the lowest value associated and the said value,
+    skipping subtrees that cannot change the result within (alpha, beta)
+    """
+    if search_stats is not None:
+        search_stats.visit(marks(board))
+    optimalAction = None
+    value = 2
+
+    for action in ordered_actions(board):
+        new_board = result(board, action)
+        if terminal(new_board):
+            new_value = utility(new_board)
+            if search_stats is not None:
+                search_stats.terminals += 1
+        else:
+            _, new_value = alphabeta_max_value(new_board, alpha, min(beta, value))
+        if new_value < value:
+            optimalAction = action
+            value = new_value
+
+        # A win cannot be improved on, and the opponent avoids values <= alpha
+        if value == -1 or value <= alpha:
+            if search_stats is not None:
+                search_stats.cutoffs += 1
+            break
+    return (optimalAction, value)
+
+
+def canonical(board):
+    """
+    Returns the canonical key of the board over its 8 symmetries,
+    and the permutation that maps the board to it.
+    """
+    flat = [cell or "." for row in board for cell in row]
+    return min(
+        ("".join(flat[k] for k in perm), perm) for perm in SYMMETRIES
+    )
+
+
+def transposition_value(board):
+    """
+    Returns the optimal action and the value of the board,
+    reusing and filling `transposition_table`
+    """
+    if search_stats is not None:
+        search_stats.visit(marks(board))
+    key, perm = canonical(board)
+    if key in transposition_table:
+        if search_stats is not None:
+            search_stats.cache_hits += 1
+        value, move = transposition_table[key]
+        action = None if move is None else divmod(perm[move], 3)
+        return (action, value)
+
+    maximizing = player(board) == X
+    optimalAction = None
+    value = -2 if maximizing else 2
+
+    for action in ordered_actions(board):
+        new_board = result(board, action)
+        if terminal(new_board):
+            new_value = utility(new_board)
+            if search_stats is not None:
+                search_stats.terminals += 1
+        else:
+            _, new_value = transposition_value(new_board)
+        if new_value > value if maximizing else new_value < value:
+            optimalAction = action
+            value = new_value
+
+    move = None
+    if optimalAction is not None:
+        move = perm.index(optimalAction[0] * 3 + optimalAction[1])
+    transposition_table[key] = (value, move)
+    return (optimalAction, value)
+
+
+def board_index(board):
+    """
+    Returns the board read as a base-3 number, EMPTY, X and O
+    being the digits 0, 1 and 2.
+    """
+    index = 0
+    for row in board:
+        for cell in row:
+            index = index * 3 + (0 if cell == EMPTY else 1 if cell == X else 2)
+    return index
+
+
+def load_book(path=BOOK_PATH):
+    """
+    Loads the opening book into `book` and returns it,
+    or None if the file is missing or malformed.
+    """
+    global book
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        data = None
+    book = data if data is not None and len(data) == BOOK_SIZE else None
+    return book
+
+
+def book_entry(board):
+    """
+    Returns the opening book byte of the board,
+    or None if there is no book or the board is not in it.
+    """
+    if book is False:
+        load_book()
+    if book is None:
+        return None
+    entry = book[board_index(board)]
+    return None if entry == UNREACHABLE else entry
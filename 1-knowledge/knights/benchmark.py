@@ -0,0 +1,81 @@
+"""
+Compares the model_check methods on generated knights and knaves puzzles,
+times relative to the first method run on each puzzle
+"""
+
+import sys
+import time
+
+from logic import *
+
+# A puzzle of n people, each a knight or a knave, has 2n symbols
+PEOPLE = [3, 4, 6, 8, 10]
+
+METHODS = ["recursive", "compiled", "vectorized"]
+
+# The recursive check is skipped above this many symbols
+RECURSIVE_LIMIT = 16
+
+
+def line_puzzle(n):
+    """
+    Returns the knowledge base and the symbols of a line of n people,
+    each saying "the next person is a knave" except the last, who says
+    "I am a knave or the first person is a knight" (a knave, for even n).
+
+    Only a knight can make the last statement, which fixes everyone's
+    kind: the puzzle has exactly one model.
+    """
+    knights = [Symbol(f"{i} is a Knight") for i in range(n)]
+    knaves = [Symbol(f"{i} is a Knave") for i in range(n)]
+    knowledge = And()
+    for i in range(n):
+        knowledge = knowledge.add(Biconditional(knights[i], Not(knaves[i])))
+        if i + 1 < n:
+            said = knaves[i + 1]
+        else:
+            first = knights[0] if n % 2 else knaves[0]
+            said = Or(knaves[i], first)
+        knowledge = knowledge.add(Biconditional(knights[i], said))
+    return knowledge, knights + knaves
+
+
+def measure(knowledge, symbols, method):
+    """
+    Returns the symbols entailed by the knowledge base
+    and the seconds taken to check them all.
+    """
+    start = time.perf_counter()
+    entailed = [symbol for symbol in symbols
+                if model_check(knowledge, symbol, method=method)]
+    return entailed, time.perf_counter() - start
+
+
+def main():
+    methods = sys.argv[1:] or METHODS
+    for n in PEOPLE:
+        knowledge, symbols = line_puzzle(n)
+        print(f"{n} people, {len(symbols)} symbols")
+
+        # An inconsistent knowledge base would entail every symbol
+        if model_check(knowledge, Or(), method="sat"):
+            raise Exception(f"the {n} person puzzle has no model")
+        baseline = None
+        for method in methods:
+            if method == "recursive" and len(symbols) > RECURSIVE_LIMIT:
+                print(f"    {method:<11} skipped")
+                continue
+            entailed, seconds = measure(knowledge, symbols, method)
+            if baseline is None:
+                baseline = (seconds, entailed)
+            elif entailed != baseline[1]:
+                raise Exception(f"{method} disagrees with {methods[0]}")
+            if len(entailed) != n:
+                raise Exception(f"{method} did not solve the puzzle")
+            print(f"    {method:<11} entailed={len(entailed):>2} "
+                  f"time={seconds * 1000:9.1f} ms "
+                  f"({baseline[0] / seconds:6.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,58 @@
 import itertools
+import multiprocessing
+import os
+import weakref
+
+# Every live sentence, keyed by its class and constructor arguments,
+# so that structurally equal sentences are one shared node
+nodes = weakref.WeakValueDictionary()
+
+# Models a parallel_model_check worker checks between two looks
+# at whether another worker already found a counterexample
+CHECK_INTERVAL = 4096
+
+# Models evaluated together by vectorized_model_check are 2^CHUNK_BITS
+CHUNK_BITS = 16
+
+# Compiled sentences of a parallel_model_check worker, and the event
+# set by the first worker to find a counterexample
+worker_knowledge = None
+worker_query = None
+counterexample_found = None
 
 
 class Sentence():
+    """Immutable, interned logical sentence: constructing a sentence
+    equal to a live one returns that node, so equality is identity and
+    the hash and symbols are computed once per node."""
+
+    __slots__ = ("_arguments", "_hash", "_symbols", "__weakref__")
+
+    @classmethod
+    def intern(cls, arguments, **fields):
+        """Returns the node of class `cls` built from `arguments`,
+        creating it with attributes `fields` if there is none yet."""
+        key = (cls, arguments)
+        node = nodes.get(key)
+        if node is None:
+            node = object.__new__(cls)
+            object.__setattr__(node, "_arguments", arguments)
+            object.__setattr__(node, "_hash", hash(key))
+            object.__setattr__(node, "_symbols", None)
+            for name, value in fields.items():
+                object.__setattr__(node, name, value)
+            nodes[key] = node
+        return node
+
+    def __setattr__(self, name, value):
+        raise AttributeError("sentences are immutable")
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        # Unpickled sentences are interned again in the new process
+        return (type(self), self._arguments)
 
     def evaluate(self, model):
         """Evaluates the logical sentence."""
@@ -12,8 +63,17 @@ class Sentence():
         return ""
 
     def symbols(self):
-        """Returns a set of all symbols in the logical sentence."""
-        return set()
+        """Returns a frozenset of all symbols in the logical sentence."""
+        if self._symbols is None:
+            object.__setattr__(self, "_symbols", frozenset().union(
+                *[argument.symbols() for argument in self._arguments]
+            ))
+        return self._symbols
+
+    def expression(self, positions):
+        """Returns a Python expression evaluating the sentence on an
+        integer model `m`, symbol `name` being bit `positions[name]`."""
+        raise Exception("nothing to compile")
 
     @classmethod
     def validate(cls, sentence):
@@ -43,15 +103,10 @@ class Sentence():
 
 
 class Symbol(Sentence):
+    __slots__ = ("name",)
 
-    def __init__(self, name):
-        self.name = name
-
-    def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
-
-    def __hash__(self):
-        return hash(("symbol", self.name))
+    def __new__(cls, name):
+        return cls.intern((name,), name=name, _symbols=frozenset((name,)))
 
     def __repr__(self):
         return self.name
@@ -65,20 +120,19 @@ class Symbol(Sentence):
     def formula(self):
         return self.name
 
-    def symbols(self):
-        return {self.name}
+    def expression(self, positions):
+        try:
+            return f"(m >> {positions[self.name]} & 1)"
+        except KeyError:
+            raise Exception(f"variable {self.name} not in model")
 
 
 class Not(Sentence):
-    def __init__(self, operand):
-        Sentence.validate(operand)
-        self.operand = operand
+    __slots__ = ("operand",)
 
-    def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
-
-    def __hash__(self):
-        return hash(("not", hash(self.operand)))
+    def __new__(cls, operand):
+        Sentence.validate(operand)
+        return cls.intern((operand,), operand=operand)
 
     def __repr__(self):
         return f"Not({self.operand})"
@@ -89,23 +143,17 @@ class Not(Sentence):
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
-    def symbols(self):
-        return self.operand.symbols()
+    def expression(self, positions):
+        return f"(not {self.operand.expression(positions)})"
 
 
 class And(Sentence):
-    def __init__(self, *conjuncts):
+    __slots__ = ("conjuncts",)
+
+    def __new__(cls, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
-        self.conjuncts = list(conjuncts)
-
-    def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
-
-    def __hash__(self):
-        return hash(
-            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
-        )
+        return cls.intern(conjuncts, conjuncts=conjuncts)
 
     def __repr__(self):
         conjunctions = ", ".join(
@@ -114,8 +162,9 @@ class And(Sentence):
         return f"And({conjunctions})"
 
     def add(self, conjunct):
+        """Returns the conjunction of these conjuncts and `conjunct`."""
         Sentence.validate(conjunct)
-        self.conjuncts.append(conjunct)
+        return And(*self.conjuncts, conjunct)
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
@@ -126,23 +175,20 @@ class And(Sentence):
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+    def expression(self, positions):
+        if not self.conjuncts:
+            return "True"
+        return "(" + " and ".join(conjunct.expression(positions)
+                                  for conjunct in self.conjuncts) + ")"
 
 
 class Or(Sentence):
-    def __init__(self, *disjuncts):
+    __slots__ = ("disjuncts",)
+
+    def __new__(cls, *disjuncts):
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
-        self.disjuncts = list(disjuncts)
-
-    def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
-
-    def __hash__(self):
-        return hash(
-            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
-        )
+        return cls.intern(disjuncts, disjuncts=disjuncts)
 
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
@@ -157,24 +203,21 @@ class Or(Sentence):
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+    def expression(self, positions):
+        if not self.disjuncts:
+            return "False"
+        return "(" + " or ".join(disjunct.expression(positions)
+                                 for disjunct in self.disjuncts) + ")"
 
 
 class Implication(Sentence):
-    def __init__(self, antecedent, consequent):
+    __slots__ = ("antecedent", "consequent")
+
+    def __new__(cls, antecedent, consequent):
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
-        self.antecedent = antecedent
-        self.consequent = consequent
-
-    def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
-
-    def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+        return cls.intern((antecedent, consequent),
+                          antecedent=antecedent, consequent=consequent)
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
@@ -188,24 +231,19 @@ class Implication(Sentence):
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+    def expression(self, positions):
+        antecedent = self.antecedent.expression(positions)
+        consequent = self.consequent.expression(positions)
+        return f"((not {antecedent}) or {consequent})"
 
 
 class Biconditional(Sentence):
-    def __init__(self, left, right):
+    __slots__ = ("left", "right")
+
+    def __new__(cls, left, right):
         Sentence.validate(left)
         Sentence.validate(right)
-        self.left = left
-        self.right = right
-
-    def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
-
-    def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+        return cls.intern((left, right), left=left, right=right)
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
@@ -221,12 +259,32 @@ class Biconditional(Sentence):
         right = Sentence.parenthesize(str(self.right))
         return f"{left} <=> {right}"
 
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
-
-
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+    def expression(self, positions):
+        left = self.left.expression(positions)
+        right = self.right.expression(positions)
+        return f"((not {left}) == (not {right}))"
+
+
+def model_check(knowledge, query, method="recursive"):
+    """Checks if knowledge base entails query.
+
+    `method` selects how entailment is checked: "recursive" builds a
+    dict per model, "compiled" compiles both sentences once and counts
+    through the models as integers, "parallel" splits those integers
+    across a process pool, "vectorized" evaluates chunks of them as
+    NumPy arrays, and "sat" asks a CDCL solver whether knowledge and
+    not query is unsatisfiable.
+    """
+    if method == "compiled":
+        return compiled_model_check(knowledge, query)
+    if method == "parallel":
+        return parallel_model_check(knowledge, query)
+    if method == "vectorized":
+        return vectorized_model_check(knowledge, query)
+    if method == "sat":
+        return sat_model_check(knowledge, query)
+    if method != "recursive":
+        raise ValueError(f"unknown model_check method: {method}")
 
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
@@ -257,7 +315,441 @@ def model_check(knowledge, query):
                     check_all(knowledge, query, remaining, model_false))
 
     # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
+    symbols = set(knowledge.symbols() | query.symbols())
 
     # Check that knowledge entails query
     return check_all(knowledge, query, symbols, dict())
+
+
+def compile_sentence(sentence, positions):
+    """Compiles a sentence into a function of an integer model `m`,
+    symbol `name` being true when bit `positions[name]` of `m` is set."""
+    try:
+        return eval(f"lambda m: {sentence.expression(positions)}")
+    except (SyntaxError, RecursionError, MemoryError):
+        pass
+
+    # Too deeply nested for the Python parser: walk the tree instead
+    bits = [(name, positions[name]) for name in sentence.symbols()
+            if name in positions]
+
+    def holds(m):
+        return sentence.evaluate({name: m >> bit & 1 for name, bit in bits})
+    return holds
+
+
+def compiled_model_check(knowledge, query):
+    """Checks if knowledge base entails query, enumerating the models
+    as the integers 0 to 2^n - 1 over compiled sentences."""
+    symbols = sorted(knowledge.symbols() | query.symbols())
+    positions = {symbol: i for i, symbol in enumerate(symbols)}
+    knowledge = compile_sentence(knowledge, positions)
+    query = compile_sentence(query, positions)
+
+    # Entailment fails on any model where knowledge holds but query does not
+    for model in range(1 << len(symbols)):
+        if knowledge(model) and not query(model):
+            return False
+    return True
+
+
+def init_model_worker(knowledge, query, symbols, found):
+    """Compiles the sentences once in a pool worker."""
+    global worker_knowledge, worker_query, counterexample_found
+    positions = {symbol: i for i, symbol in enumerate(symbols)}
+    worker_knowledge = compile_sentence(knowledge, positions)
+    worker_query = compile_sentence(query, positions)
+    counterexample_found = found
+
+
+def check_models(bounds):
+    """Checks the models from `start` up to `stop` in a pool worker.
+    Returns False if one is a counterexample to entailment, True if
+    none is or another worker found one first."""
+    start, stop = bounds
+    knowledge, query = worker_knowledge, worker_query
+    for block in range(start, stop, CHECK_INTERVAL):
+        if counterexample_found.is_set():
+            return True
+        for model in range(block, min(block + CHECK_INTERVAL, stop)):
+            if knowledge(model) and not query(model):
+                counterexample_found.set()
+                return False
+    return True
+
+
+def parallel_model_check(knowledge, query, workers=None):
+    """Checks if knowledge base entails query like compiled_model_check,
+    splitting the models by their highest symbol bits into ranges
+    checked by a pool of `workers` processes, and stopping them all at
+    the first counterexample."""
+    workers = workers or os.cpu_count()
+    symbols = sorted(knowledge.symbols() | query.symbols())
+
+    # Several ranges per worker keep them all busy until the end
+    prefix_bits = min(len(symbols), (4 * workers - 1).bit_length())
+    low_bits = len(symbols) - prefix_bits
+    ranges = [(prefix << low_bits, (prefix + 1) << low_bits)
+              for prefix in range(1 << prefix_bits)]
+
+    found = multiprocessing.Event()
+    with multiprocessing.Pool(
+        workers, initializer=init_model_worker,
+        initargs=(knowledge, query, symbols, found)
+    ) as pool:
+        # Leaving the block terminates workers still checking
+        return all(pool.imap_unordered(check_models, ranges))
+
+
+def vectorized_model_check(knowledge, query, chunk_bits=CHUNK_BITS):
+    """Checks if knowledge base entails query, evaluating both sentences
+    on 2^chunk_bits integer models at a time as NumPy boolean arrays,
+    one column per symbol."""
+    import numpy
+
+    symbols = sorted(knowledge.symbols() | query.symbols())
+    chunk_bits = min(chunk_bits, len(symbols))
+    size = 1 << chunk_bits
+
+    # The low symbols enumerate the models of a chunk, the high ones are
+    # the same throughout it
+    offsets = numpy.arange(size, dtype=numpy.uint32)
+    low = [(offsets >> i & 1).astype(bool) for i in range(chunk_bits)]
+    true = numpy.ones(size, dtype=bool)
+    false = numpy.zeros(size, dtype=bool)
+
+    for chunk in range(1 << (len(symbols) - chunk_bits)):
+        columns = dict(zip(symbols, low))
+        for i, symbol in enumerate(symbols[chunk_bits:]):
+            columns[symbol] = true if chunk >> i & 1 else false
+
+        # Shared subformulas are evaluated once per chunk
+        values = {}
+
+        def value(sentence):
+            if sentence in values:
+                return values[sentence]
+            if isinstance(sentence, Symbol):
+                result = columns[sentence.name]
+            elif isinstance(sentence, Not):
+                result = ~value(sentence.operand)
+            elif isinstance(sentence, And):
+                result = true
+                for conjunct in sentence.conjuncts:
+                    result = result & value(conjunct)
+            elif isinstance(sentence, Or):
+                result = false
+                for disjunct in sentence.disjuncts:
+                    result = result | value(disjunct)
+            elif isinstance(sentence, Implication):
+                result = ~value(sentence.antecedent) | value(sentence.consequent)
+            elif isinstance(sentence, Biconditional):
+                result = value(sentence.left) == value(sentence.right)
+            else:
+                raise TypeError("must be a logical sentence")
+            values[sentence] = result
+            return result
+
+        if (value(knowledge) & ~value(query)).any():
+            return False
+    return True
+
+
+class KnowledgeBase():
+    """Conjunction of sentences whose satisfying models are enumerated
+    once, as integers over compiled sentences, and kept to answer any
+    number of queries.
+
+    Conjuncts added with `add` narrow the cached models instead of
+    re-enumerating them.
+    """
+
+    def __init__(self, knowledge=None):
+        if knowledge is None:
+            knowledge = And()
+        elif not isinstance(knowledge, And):
+            knowledge = And(knowledge)
+        self.knowledge = knowledge
+        self.symbols = []
+        self.positions = {}
+        self.models = [0]
+        self.seen = 0
+        self.answers = {}
+
+    def add(self, conjunct):
+        """Adds a conjunct to the knowledge base."""
+        self.knowledge = self.knowledge.add(conjunct)
+        self.update()
+
+    def update(self):
+        """Filters the cached models by conjuncts not yet seen, first
+        splitting each model on the symbols they introduce."""
+        conjuncts = self.knowledge.conjuncts
+        if self.seen == len(conjuncts):
+            return
+        for conjunct in conjuncts[self.seen:]:
+            for symbol in sorted(conjunct.symbols() - self.positions.keys()):
+                bit = 1 << len(self.symbols)
+                self.positions[symbol] = len(self.symbols)
+                self.symbols.append(symbol)
+                self.models += [model | bit for model in self.models]
+            holds = compile_sentence(conjunct, self.positions)
+            self.models = [model for model in self.models if holds(model)]
+        self.seen = len(conjuncts)
+        self.answers.clear()
+
+    def entails(self, query):
+        """Checks if the knowledge base entails query."""
+        self.update()
+        if query not in self.answers:
+            self.answers[query] = self.check(query)
+        return self.answers[query]
+
+    def check(self, query):
+        # Symbols only the query mentions take every value in every model
+        extra = sorted(query.symbols() - self.positions.keys())
+        positions = dict(self.positions)
+        positions.update(
+            (symbol, len(self.symbols) + i) for i, symbol in enumerate(extra)
+        )
+        holds = compile_sentence(query, positions)
+        extensions = [i << len(self.symbols) for i in range(1 << len(extra))]
+        return all(holds(model | extension)
+                   for model in self.models for extension in extensions)
+
+
+class CNF():
+    """Clauses of a Tseitin encoding: each subformula gets a variable
+    equivalent to it, so the encoding grows linearly with the sentence.
+    Variables are positive integers and literals are signed variables."""
+
+    def __init__(self):
+        self.variables = {}
+        self.clauses = []
+
+    def variable(self, key):
+        """Returns the variable of a key, creating it if needed."""
+        if key not in self.variables:
+            self.variables[key] = len(self.variables) + 1
+        return self.variables[key]
+
+    def literal(self, sentence):
+        """Returns a literal equivalent to the sentence, adding the
+        clauses defining it."""
+        if isinstance(sentence, Symbol):
+            return self.variable(("symbol", sentence.name))
+        if isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+        if sentence in self.variables:
+            return self.variables[sentence]
+
+        if isinstance(sentence, And):
+            parts = [self.literal(conjunct) for conjunct in sentence.conjuncts]
+            v = self.variable(sentence)
+            self.clauses.extend([-v, part] for part in parts)
+            self.clauses.append([v] + [-part for part in parts])
+        elif isinstance(sentence, Or):
+            parts = [self.literal(disjunct) for disjunct in sentence.disjuncts]
+            v = self.variable(sentence)
+            self.clauses.extend([v, -part] for part in parts)
+            self.clauses.append([-v] + parts)
+        elif isinstance(sentence, Implication):
+            a = self.literal(sentence.antecedent)
+            b = self.literal(sentence.consequent)
+            v = self.variable(sentence)
+            self.clauses.extend([[-v, -a, b], [v, a], [v, -b]])
+        elif isinstance(sentence, Biconditional):
+            a = self.literal(sentence.left)
+            b = self.literal(sentence.right)
+            v = self.variable(sentence)
+            self.clauses.extend([[-v, -a, b], [-v, a, -b],
+                                 [v, a, b], [v, -a, -b]])
+        else:
+            raise TypeError("must be a logical sentence")
+        return v
+
+
+class CDCLSolver():
+    """DPLL satisfiability solver with unit propagation over two watched
+    literals per clause, first-UIP clause learning, non-chronological
+    backjumping and activity-based branching."""
+
+    def __init__(self, num_variables, clauses):
+        self.values = [0] * (num_variables + 1)
+        self.levels = [0] * (num_variables + 1)
+        self.reasons = [None] * (num_variables + 1)
+        self.activity = [0.0] * (num_variables + 1)
+        self.bump = 1.0
+        self.trail = []
+        self.trail_limits = []
+        self.head = 0
+        self.clauses = []
+        self.watches = {}
+        self.units = []
+        self.empty = False
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def value(self, literal):
+        """Returns 1 if literal is true, -1 if false, 0 if unassigned."""
+        value = self.values[abs(literal)]
+        return value if literal > 0 else -value
+
+    def add_clause(self, clause):
+        clause = list(dict.fromkeys(clause))
+        if any(-literal in clause for literal in clause):
+            return None
+        if not clause:
+            self.empty = True
+            return None
+        if len(clause) == 1:
+            self.units.append(clause[0])
+            return None
+        self.clauses.append(clause)
+        index = len(self.clauses) - 1
+        self.watches.setdefault(clause[0], []).append(index)
+        self.watches.setdefault(clause[1], []).append(index)
+        return index
+
+    def assign(self, literal, reason):
+        variable = abs(literal)
+        self.values[variable] = 1 if literal > 0 else -1
+        self.levels[variable] = len(self.trail_limits)
+        self.reasons[variable] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """Assigns every literal implied by unit clauses.
+        Returns the index of a conflicting clause, or None."""
+        while self.head < len(self.trail):
+            false_literal = -self.trail[self.head]
+            self.head += 1
+            watching = self.watches.get(false_literal, [])
+            kept = []
+            for position, index in enumerate(watching):
+                clause = self.clauses[index]
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], clause[0]
+                if self.value(clause[0]) == 1:
+                    kept.append(index)
+                    continue
+
+                # Look for another literal to watch instead
+                for k in range(2, len(clause)):
+                    if self.value(clause[k]) != -1:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        self.watches.setdefault(clause[1], []).append(index)
+                        break
+                else:
+                    kept.append(index)
+                    if self.value(clause[0]) == -1:
+                        kept.extend(watching[position + 1:])
+                        self.watches[false_literal] = kept
+                        return index
+                    self.assign(clause[0], index)
+            self.watches[false_literal] = kept
+        return None
+
+    def analyze(self, conflict):
+        """Returns the first-UIP clause learned from a conflict, its
+        asserting literal first, and the level to backjump to."""
+        level = len(self.trail_limits)
+        learned = [None]
+        seen = set()
+        pending = 0
+        literal = None
+        position = len(self.trail) - 1
+        clause = self.clauses[conflict]
+        while True:
+            for other in clause:
+                variable = abs(other)
+                if other == literal or variable in seen:
+                    continue
+                if self.levels[variable] == 0:
+                    continue
+                seen.add(variable)
+                self.activity[variable] += self.bump
+                if self.levels[variable] == level:
+                    pending += 1
+                else:
+                    learned.append(other)
+
+            # Walk back to the latest literal of the conflict
+            while abs(self.trail[position]) not in seen:
+                position -= 1
+            literal = self.trail[position]
+            position -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.clauses[self.reasons[abs(literal)]]
+
+        learned[0] = -literal
+        backjump = 0
+        if len(learned) > 1:
+            deepest = max(range(1, len(learned)),
+                          key=lambda i: self.levels[abs(learned[i])])
+            learned[1], learned[deepest] = learned[deepest], learned[1]
+            backjump = self.levels[abs(learned[1])]
+        return learned, backjump
+
+    def backtrack(self, level):
+        if len(self.trail_limits) <= level:
+            return
+        limit = self.trail_limits[level]
+        for literal in self.trail[limit:]:
+            self.values[abs(literal)] = 0
+            self.reasons[abs(literal)] = None
+        del self.trail[limit:]
+        del self.trail_limits[level:]
+        self.head = len(self.trail)
+
+    def decide(self):
+        """Returns the unassigned variable with the highest activity,
+        or None if every variable is assigned."""
+        best = None
+        for variable in range(1, len(self.values)):
+            if self.values[variable] == 0 and (
+                best is None or self.activity[variable] > self.activity[best]
+            ):
+                best = variable
+        return best
+
+    def solve(self):
+        """Returns True if the clauses are satisfiable."""
+        if self.empty:
+            return False
+        for literal in self.units:
+            if self.value(literal) == -1:
+                return False
+            if self.value(literal) == 0:
+                self.assign(literal, None)
+
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                if not self.trail_limits:
+                    return False
+                learned, backjump = self.analyze(conflict)
+                self.backtrack(backjump)
+                if len(learned) == 1:
+                    self.assign(learned[0], None)
+                else:
+                    self.assign(learned[0], self.add_clause(learned))
+                self.bump /= 0.95
+            else:
+                variable = self.decide()
+                if variable is None:
+                    return True
+                self.trail_limits.append(len(self.trail))
+                self.assign(-variable, None)
+
+
+def sat_model_check(knowledge, query):
+    """Checks if knowledge base entails query, by showing with a SAT
+    solver that knowledge and not query has no model."""
+    cnf = CNF()
+    knowledge = cnf.literal(knowledge)
+    query = cnf.literal(query)
+    clauses = cnf.clauses + [[knowledge], [-query]]
+    return not CDCLSolver(len(cnf.variables), clauses).solve()